@@ -1,8 +1,7 @@
 import streamlit as st
-import joblib
 import os
-from src.preprocess import TextPreprocessor
-from src.aspect import AspectExtractor
+from src.registry import get_registry
+from src.bulk import BulkJob, read_columns
 import pandas as pd
 
 # Set Page Config
@@ -35,16 +34,56 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# Helper function to load models
+# Helper function to load models, preprocessors and aspect extractors once per process
 @st.cache_resource
 def load_resources(lang):
-    try:
-        model = joblib.load(f'models/{lang}_logistic_model.joblib')
-        vectorizer = joblib.load(f'models/{lang}_logistic_vectorizer.joblib')
-        return model, vectorizer
-    except Exception as e:
-        st.error(f"Error loading {lang} models: {e}")
-        return None, None
+    registry = get_registry()
+    if not registry.load(lang):
+        st.error(f"Error loading {lang} models: {registry.errors.get(lang)}")
+        return None
+    return registry
+
+@st.fragment(run_every=1.0)
+def show_bulk_progress(job):
+    # Only this fragment reruns while the file is scored on a background thread,
+    # so the rest of the page stays interactive
+    st.progress(job.progress, text=f"{job.rows_done:,} rows scored")
+    if st.button("Cancel"):
+        job.cancel()
+    if not job.running:
+        st.rerun()
+
+def bulk_mode(registry, lang_code):
+    uploaded = st.file_uploader("Upload CSV / Excel" if lang_code == "en" else "ارفع ملف CSV / Excel",
+                                type=["csv", "xlsx", "xls"])
+    if uploaded is not None:
+        data = uploaded.getvalue()
+        columns = read_columns(data, uploaded.name)
+        text_col = st.selectbox("Text column" if lang_code == "en" else "عمود النص", columns,
+                                index=columns.index("text") if "text" in columns else 0)
+        job = st.session_state.get("bulk_job")
+        if st.button("Score File" if lang_code == "en" else "تحليل الملف", disabled=bool(job and job.running)):
+            if job:
+                job.discard()
+            st.session_state["bulk_job"] = BulkJob(registry, lang_code, data, uploaded.name, text_col).start()
+
+    job = st.session_state.get("bulk_job")
+    if job is None:
+        return
+    if job.running:
+        show_bulk_progress(job)
+    elif job.status == "failed":
+        st.error(f"Scoring failed: {job.error}")
+    elif job.status == "cancelled":
+        st.warning(f"Cancelled after {job.rows_done:,} rows")
+    else:
+        st.success(f"Scored {job.rows_done:,} rows")
+        col1, col2 = st.columns(2)
+        col1.bar_chart(pd.Series(job.sentiment_counts, name="rows"))
+        col2.bar_chart(pd.Series(job.aspect_counts, name="rows"))
+        with open(job.output_path, "rb") as f:
+            st.download_button("Download Results" if lang_code == "en" else "تحميل النتائج", f,
+                               file_name=f"{os.path.splitext(job.filename)[0]}_scored.csv", mime="text/csv")
 
 def main():
     st.title("🤖 Sentiment & Aspect Analysis")
@@ -64,9 +103,13 @@ def main():
     lang_code = "en" if lang_option == "English" else "ar"
     
     # Load resources
-    model, vectorizer = load_resources(lang_code)
+    registry = load_resources(lang_code)
     
-    if model and vectorizer:
+    mode = st.radio("Mode", ["Single Text", "Bulk File"], horizontal=True)
+
+    if registry and mode == "Bulk File":
+        bulk_mode(registry, lang_code)
+    elif registry:
         # Input Section
         label = "Enter Text" if lang_code == "en" else "أدخل النص هنا"
         text_input = st.text_area(label, height=150)
@@ -74,16 +117,13 @@ def main():
         if st.button("Analysis" if lang_code == "en" else "تحليل"):
             if text_input.strip():
                 # Preprocessing
-                preprocessor = TextPreprocessor(lang=lang_code)
-                cleaned_text = preprocessor.preprocess(text_input)
+                cleaned_text = registry.preprocessors[lang_code].preprocess(text_input)
                 
                 # Prediction
-                vec = vectorizer.transform([cleaned_text])
-                sentiment = model.predict(vec)[0]
+                sentiment = registry.predictors[lang_code].predict([cleaned_text], cleaned=True)[0]
                 
                 # Aspect Extraction
-                aspect_extractor = AspectExtractor(language=lang_code)
-                aspect = aspect_extractor.detect_aspect(text_input)
+                aspect = registry.aspect_extractors[lang_code].detect_aspect(text_input)
                 
                 # Display Results
                 st.markdown('<div class="result-box">', unsafe_allow_html=True)
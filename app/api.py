@@ -1,23 +1,55 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import joblib
+import asyncio
 import os
-from src.preprocess import TextPreprocessor
-from src.aspect import AspectExtractor
+import time
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from typing import List, Optional
+from src.registry import get_registry
+from src.cache import PredictionCache
+from src.batching import MicroBatcher
+from src.executor import AnalysisExecutor
+from src.metrics import METRICS, BATCH_SIZE_BUCKETS, TEXT_LENGTH_BUCKETS
+from src.profiling import ProfileAggregator
 
 app = FastAPI(title="Sentiment & Aspect Analysis API")
 
-# Load Models
-models = {}
-vectorizers = {}
+SUPPORTED_LANGS = ['en', 'ar']
+
+registry = get_registry()
+
+# Always-on instrumentation, exposed in Prometheus text format at /metrics
+REQUESTS = METRICS.counter('sentiment_requests', "HTTP requests by route and status", ['route', 'status'])
+ERRORS = METRICS.counter('sentiment_errors', "HTTP requests that failed (status >= 400)", ['route', 'status'])
+REQUEST_SECONDS = METRICS.histogram('sentiment_request_seconds', "End-to-end request latency", ['route'])
+STAGE_SECONDS = METRICS.histogram('sentiment_stage_seconds', "Time per scoring call and stage", ['lang', 'stage'])
+BATCH_SIZE = METRICS.histogram('sentiment_scored_batch_size', "Texts per scoring call", ['lang'],
+                               buckets=BATCH_SIZE_BUCKETS)
+TEXT_LENGTH = METRICS.histogram('sentiment_text_length_chars', "Length of incoming texts", ['lang'],
+                                buckets=TEXT_LENGTH_BUCKETS)
+
+# Result cache for repeated texts (retweets, copy-paste complaints); CACHE_MAXSIZE=0 disables it
+cache = PredictionCache(maxsize=int(os.environ.get('CACHE_MAXSIZE', 100000)),
+                        ttl=float(os.environ.get('CACHE_TTL', 3600)))
+# Any model (re)load invalidates that language's cached results
+registry.add_reload_listener(cache.invalidate)
 
-try:
-    models['en'] = joblib.load('models/en_logistic_model.joblib')
-    vectorizers['en'] = joblib.load('models/en_logistic_vectorizer.joblib')
-    models['ar'] = joblib.load('models/ar_logistic_model.joblib')
-    vectorizers['ar'] = joblib.load('models/ar_logistic_vectorizer.joblib')
-except:
-    print("Models not fully loaded yet. Run pipelines first.")
+# CPU-bound analysis runs here, keeping the event loop free for I/O and health checks
+executor = AnalysisExecutor(kind=os.environ.get('ANALYSIS_EXECUTOR', 'thread'),
+                            workers=int(os.environ.get('ANALYSIS_WORKERS', 0)) or None,
+                            max_concurrency=int(os.environ.get('ANALYSIS_MAX_CONCURRENCY', 0)) or None)
+# Profile a fraction of scoring calls (PROFILE_SAMPLE_RATE=0.01 -> 1%); adjustable at /admin/profile
+profiler = ProfileAggregator(rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)))
+
+# Large batches are split so their chunks can run on several workers at once
+ANALYSIS_CHUNK_SIZE = int(os.environ.get('ANALYSIS_CHUNK_SIZE', 1000))
+
+@app.on_event("startup")
+def load_components():
+    # Load and warm up every language once; requests then only pay for compute
+    loaded = registry.load_all()
+    if not all(loaded.values()):
+        print("Models not fully loaded yet. Run pipelines first.")
 
 class AnalysisRequest(BaseModel):
     text: str
@@ -26,25 +58,199 @@ class AnalysisRequest(BaseModel):
 class AnalysisResponse(BaseModel):
     sentiment: str
     aspect: str
+    confidence: Optional[float] = None
 
-@app.post("/analyze", response_model=AnalysisResponse)
-async def analyze_text(request: AnalysisRequest):
-    lang = request.lang
-    if lang not in ['en', 'ar']:
+class BatchAnalysisRequest(BaseModel):
+    texts: List[str]
+    lang: str = "en"
+    # Optional per-item language, overrides `lang` when given
+    langs: Optional[List[str]] = None
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[AnalysisResponse]
+
+def check_lang(lang):
+    if lang not in SUPPORTED_LANGS:
         raise HTTPException(status_code=400, detail="Language not supported. Use 'en' or 'ar'.")
-    
-    if lang not in models:
+    if not registry.is_ready(lang):
         raise HTTPException(status_code=500, detail="Model for this language not loaded.")
-    
-    preprocessor = TextPreprocessor(lang=lang)
-    aspect_extractor = AspectExtractor(language=lang)
-    
-    cleaned_v = preprocessor.preprocess(request.text)
-    vec = vectorizers[lang].transform([cleaned_v])
-    sentiment = models[lang].predict(vec)[0]
-    aspect = aspect_extractor.detect_aspect(request.text)
-    
-    return AnalysisResponse(sentiment=sentiment, aspect=aspect)
+
+def to_response(result):
+    sentiment, aspect, confidence = result
+    return AnalysisResponse(sentiment=sentiment, aspect=aspect, confidence=confidence)
+
+async def score_batch(texts, lang):
+    version = registry.versions[lang]
+    keys = [cache.make_key(lang, version, t) for t in texts]
+    results = [cache.get(key) for key in keys]
+    return [to_response(r) for r in await score_missing(lang, texts, keys, results)]
+
+async def score_missing(lang, texts, keys, results):
+    # Score each distinct missing text once, even if it repeats within the batch
+    missing = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        positions = list(missing.values())
+        unique_texts = [texts[p[0]] for p in positions]
+        chunks = [unique_texts[i:i + ANALYSIS_CHUNK_SIZE] for i in range(0, len(unique_texts), ANALYSIS_CHUNK_SIZE)]
+        scored = []
+        calls = [executor.run(lang, c, profiler.should_sample()) for c in chunks]
+        for chunk_results, timings, samples in await asyncio.gather(*calls):
+            scored.extend(chunk_results)
+            if samples is not None:
+                profiler.add(samples, tag=lang)
+            BATCH_SIZE.labels(lang).observe(len(chunk_results))
+            for stage, seconds in timings.items():
+                STAGE_SECONDS.labels(lang, stage).observe(seconds)
+        for key, same_text, result in zip(missing, positions, scored):
+            cache.put(key, result)
+            for i in same_text:
+                results[i] = result
+    return results
+
+async def process_coalesced(lang, items):
+    texts = [text for text, _ in items]
+    keys = [key for _, key in items]
+    return await score_missing(lang, texts, keys, [None] * len(items))
+
+# Coalesce concurrent single-text requests into one vectorized batch per language
+batcher = None
+if os.environ.get('MICRO_BATCHING', '1') == '1':
+    batcher = MicroBatcher(process_coalesced,
+                           max_batch_size=int(os.environ.get('BATCH_MAX_SIZE', 64)),
+                           max_wait=float(os.environ.get('BATCH_MAX_WAIT_MS', 5)) / 1000,
+                           max_in_flight=executor.max_concurrency)
+    METRICS.histogram('sentiment_coalesced_batch_size', "Requests per micro-batch flush",
+                      buckets=BATCH_SIZE_BUCKETS).attach(batcher.batch_sizes)
+    METRICS.histogram('sentiment_queue_wait_seconds', "Time a request waited for its micro-batch").attach(
+        batcher.queue_wait)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep label cardinality bounded
+        route = request.scope.get('route')
+        route = route.path if route is not None else 'unmatched'
+        REQUEST_SECONDS.labels(route).observe(time.perf_counter() - start)
+        REQUESTS.labels(route, str(status)).inc()
+        if status >= 400:
+            ERRORS.labels(route, str(status)).inc()
+
+@app.on_event("shutdown")
+async def stop_workers():
+    if batcher:
+        await batcher.close()
+    executor.shutdown()
+
+@app.get("/health")
+async def health():
+    return registry.readiness()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    cache_stats = cache.stats()
+    gauges = {
+        'sentiment_cache_entries': ("Entries in the prediction cache", cache_stats['size']),
+        'sentiment_models_ready': ("1 if every language is loaded", int(registry.is_ready())),
+    }
+    counters = {
+        'sentiment_cache_hits': ("Prediction cache hits since start", cache_stats['hits']),
+        'sentiment_cache_misses': ("Prediction cache misses since start", cache_stats['misses']),
+        'sentiment_cache_evictions': ("Prediction cache evictions since start", cache_stats['evictions']),
+    }
+    return PlainTextResponse(METRICS.render(gauges, counters), media_type='text/plain; version=0.0.4')
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return cache.stats()
+
+@app.get("/batching/stats")
+async def batching_stats():
+    return batcher.stats() if batcher else {'enabled': False}
+
+@app.get("/executor/stats")
+async def executor_stats():
+    return executor.stats()
+
+@app.get("/admin/profile")
+async def profile_status():
+    return profiler.stats()
+
+@app.post("/admin/profile")
+async def set_profile_rate(rate: float):
+    # rate=0 turns profiling off; collected samples are kept until reset
+    if not 0 <= rate <= 1:
+        raise HTTPException(status_code=400, detail="rate must be between 0 and 1.")
+    profiler.rate = rate
+    return profiler.stats()
+
+@app.delete("/admin/profile")
+async def reset_profile():
+    profiler.reset()
+    return profiler.stats()
+
+@app.get("/admin/profile/report", response_class=PlainTextResponse)
+async def profile_report(top: int = 30):
+    return profiler.report(top)
+
+@app.get("/admin/profile/collapsed", response_class=PlainTextResponse)
+async def profile_collapsed():
+    # Feed to flamegraph.pl or speedscope; counts are microseconds
+    return PlainTextResponse(profiler.collapsed(),
+                             headers={'Content-Disposition': 'attachment; filename="profile.collapsed"'})
+
+@app.post("/admin/reload")
+def reload_models():
+    # Reloading fires the registry listeners, which invalidate the result cache
+    registry.load_all(force=True)
+    # Process workers hold their own model copies, so start fresh ones
+    if executor.kind == 'process':
+        executor.restart()
+    return registry.readiness()
+
+@app.post("/analyze", response_model=AnalysisResponse)
+async def analyze_text(request: AnalysisRequest):
+    check_lang(request.lang)
+    TEXT_LENGTH.labels(request.lang).observe(len(request.text))
+    if batcher is None:
+        return (await score_batch([request.text], request.lang))[0]
+
+    key = cache.make_key(request.lang, registry.versions[request.lang], request.text)
+    result = cache.get(key)
+    if result is None:
+        result = await batcher.submit(request.lang, (request.text, key))
+    return to_response(result)
+
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest):
+    langs = request.langs or [request.lang] * len(request.texts)
+    if len(langs) != len(request.texts):
+        raise HTTPException(status_code=400, detail="'langs' must have the same length as 'texts'.")
+
+    # Group item positions by language so each group is scored in one pass
+    groups = {}
+    for i, lang in enumerate(langs):
+        groups.setdefault(lang, []).append(i)
+    for lang in groups:
+        check_lang(lang)
+    for text, lang in zip(request.texts, langs):
+        TEXT_LENGTH.labels(lang).observe(len(text))
+
+    results = [None] * len(request.texts)
+    for lang, positions in groups.items():
+        scored = await score_batch([request.texts[i] for i in positions], lang)
+        for i, result in zip(positions, scored):
+            results[i] = result
+
+    return BatchAnalysisResponse(results=results)
 
 if __name__ == "__main__":
     import uvicorn
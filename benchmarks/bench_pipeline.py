@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+from src.preprocess import TextPreprocessor, STEM_CACHE
+from src.aspect import AspectExtractor
+from src.artifacts import load_predictor
+from benchmarks.corpus import synthetic_tweets
+
+def best_of(fn, repeats):
+    # Minimum over repeats is the least noisy estimate of the stage's own cost
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def record(results, name, seconds, n_items):
+    results[name] = {
+        'seconds': seconds,
+        'items': n_items,
+        'us_per_item': seconds / n_items * 1e6,
+        'items_per_second': n_items / seconds if seconds else float('inf'),
+    }
+    print(f"  {name:<40} {results[name]['us_per_item']:>10.1f} us/item  {results[name]['items_per_second']:>12.0f} items/s")
+
+def bench_lang(lang, model_types, n_rows, n_single, repeats, results):
+    texts = synthetic_tweets(lang, n_rows)
+    single = texts[:n_single]
+    series = pd.Series(texts)
+    preprocessor = TextPreprocessor(lang=lang)
+    extractor = AspectExtractor(language=lang)
+    print(f"[{lang}] {n_rows} synthetic tweets")
+
+    # Stem cache is cleared before each run so repeats measure the same (cold-start) work
+    def per_item_preprocess():
+        STEM_CACHE.clear()
+        for t in single:
+            preprocessor.preprocess(t)
+
+    def batch_preprocess():
+        STEM_CACHE.clear()
+        preprocessor.preprocess_batch(series)
+
+    record(results, f'{lang}/preprocess/per_item', best_of(per_item_preprocess, repeats), len(single))
+    record(results, f'{lang}/preprocess/batch', best_of(batch_preprocess, repeats), n_rows)
+    record(results, f'{lang}/aspect/per_item',
+           best_of(lambda: [extractor.detect_aspect(t) for t in single], repeats), len(single))
+    record(results, f'{lang}/aspect/batch', best_of(lambda: extractor.detect_aspects_batch(texts), repeats), n_rows)
+
+    cleaned = preprocessor.preprocess_batch(series).tolist()
+    for model_type in model_types:
+        try:
+            predictor = load_predictor(lang, model_type)
+        except FileNotFoundError:
+            print(f"  no {lang}/{model_type} model in models/, skipped")
+            continue
+        vectorizer, model = predictor.vectorizer, predictor.model
+        prefix = f'{lang}/{model_type}'
+        record(results, f'{prefix}/vectorize/per_item',
+               best_of(lambda: [vectorizer.transform([t]) for t in cleaned[:n_single]], repeats), n_single)
+        record(results, f'{prefix}/vectorize/batch', best_of(lambda: vectorizer.transform(cleaned), repeats), n_rows)
+
+        matrix = vectorizer.transform(cleaned)
+        rows = [matrix[i] for i in range(n_single)]
+        record(results, f'{prefix}/predict/per_item', best_of(lambda: [model.predict(r) for r in rows], repeats), n_single)
+        record(results, f'{prefix}/predict/batch', best_of(lambda: model.predict(matrix), repeats), n_rows)
+
+def compare(results, baseline, tolerance):
+    """Return the stages whose per-item time regressed by more than `tolerance` vs the baseline."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        ratio = current['us_per_item'] / previous['us_per_item']
+        if ratio > 1 + tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stage-level benchmark: preprocess -> aspect -> vectorize -> predict")
+    parser.add_argument('--rows', type=int, default=20000, help="synthetic tweets per language (batched stages)")
+    parser.add_argument('--single', type=int, default=1000, help="items timed one by one (per-item stages)")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--langs', nargs='+', default=['en', 'ar'])
+    parser.add_argument('--model-types', nargs='+', default=['logistic', 'mlp'])
+    parser.add_argument('--output', default='reports/benchmarks/latest.json')
+    parser.add_argument('--baseline', default='reports/benchmarks/baseline.json')
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    args = parser.parse_args()
+    os.chdir(ROOT)
+
+    results = {}
+    for lang in args.langs:
+        bench_lang(lang, args.model_types, args.rows, min(args.single, args.rows), args.repeats, results)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'rows': args.rows,
+            'single': args.single,
+            'repeats': args.repeats,
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"Results saved to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, ratio in regressions:
+            print(f"REGRESSION {name}: {ratio:.2f}x slower than baseline")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
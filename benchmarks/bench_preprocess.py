@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.preprocess import TextPreprocessor, STEM_CACHE, parallel_preprocess
+from benchmarks.corpus import synthetic_tweets
+
+def bench(lang, n_rows, n_jobs=1, chunksize=10000):
+    series = pd.Series(synthetic_tweets(lang, n_rows))
+    # Add some missing values, which both paths must map to ""
+    series.iloc[::1000] = None
+    preprocessor = TextPreprocessor(lang=lang)
+
+    # Cold stem cache for both runs so neither path benefits from the other
+    STEM_CACHE.clear()
+    start = time.perf_counter()
+    expected = series.apply(preprocessor.preprocess)
+    apply_time = time.perf_counter() - start
+
+    STEM_CACHE.clear()
+    start = time.perf_counter()
+    result = preprocessor.preprocess_batch(series)
+    batch_time = time.perf_counter() - start
+
+    assert result.equals(expected), f"preprocess_batch output differs from apply for {lang}"
+    print(f"[{lang}] rows={n_rows}  apply={apply_time:.2f}s  "
+          f"preprocess_batch={batch_time:.2f}s  speedup={apply_time / batch_time:.2f}x")
+
+    if n_jobs > 1:
+        STEM_CACHE.clear()
+        start = time.perf_counter()
+        parallel = parallel_preprocess(series, lang=lang, n_jobs=n_jobs, chunksize=chunksize)
+        parallel_time = time.perf_counter() - start
+        assert parallel.equals(expected), f"parallel_preprocess output differs from apply for {lang}"
+        print(f"[{lang}] parallel_preprocess jobs={n_jobs} chunksize={chunksize}: "
+              f"{parallel_time:.2f}s  speedup={apply_time / parallel_time:.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Series.apply vs TextPreprocessor.preprocess_batch")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--langs', nargs='+', default=['en', 'ar'])
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunksize', type=int, default=10000)
+    args = parser.parse_args()
+    for lang in args.langs:
+        bench(lang, args.rows, args.jobs, args.chunksize)
@@ -0,0 +1,56 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.artifacts import load_predictor
+from src.runtime import NumpyModel, export_arrays
+from benchmarks.corpus import synthetic_tweets
+
+def import_time(statement):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', statement], cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+def bench(lang, model_type, n_rows, n_single):
+    try:
+        predictor = load_predictor(lang, model_type)
+    except FileNotFoundError:
+        print(f"[{lang}/{model_type}] no trained model, skipped")
+        return
+    runtime = NumpyModel(export_arrays(predictor.vectorizer, predictor.model))
+    cleaned = [predictor.preprocessor.preprocess(t) for t in synthetic_tweets(lang, n_rows)]
+
+    # Exactness: same labels, probabilities equal up to floating point summation order
+    vec = predictor.vectorizer.transform(cleaned)
+    expected = predictor.model.predict(vec)
+    labels = runtime.predict(cleaned)
+    assert (labels == expected.astype(str)).all(), f"{lang}/{model_type}: label mismatch"
+    np.testing.assert_allclose(runtime.predict_proba(cleaned), predictor.model.predict_proba(vec), rtol=1e-9, atol=1e-12)
+
+    def per_item(fn):
+        start = time.perf_counter()
+        for text in cleaned[:n_single]:
+            fn([text])
+        return (time.perf_counter() - start) / n_single * 1e6
+
+    sk_us = per_item(lambda t: predictor.model.predict_proba(predictor.vectorizer.transform(t)))
+    np_us = per_item(runtime.predict_with_confidence)
+    print(f"[{lang}/{model_type}] {n_rows} rows identical; single item: sklearn={sk_us:.0f}us numpy={np_us:.0f}us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and time the NumPy runtime against scikit-learn")
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--single', type=int, default=1000)
+    args = parser.parse_args()
+    for lang in ['en', 'ar']:
+        for model_type in ['logistic', 'mlp']:
+            bench(lang, model_type, args.rows, args.single)
+    print(f"import src.runtime: {import_time('import src.runtime'):.2f}s")
+    print(f"import sklearn estimators + joblib: "
+          f"{import_time('import joblib, sklearn.linear_model, sklearn.neural_network, sklearn.feature_extraction.text'):.2f}s")
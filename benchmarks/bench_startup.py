@@ -0,0 +1,55 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# app/api.py is loaded by path: the root-level app.py (Streamlit) shadows the app/ directory
+API_IMPORT = ("import importlib.util as u; spec = u.spec_from_file_location('api', 'app/api.py'); "
+              "spec.loader.exec_module(u.module_from_spec(spec))")
+
+# Each scenario runs in a fresh interpreter, so module caches from earlier runs don't hide import cost
+SCENARIOS = {
+    'interpreter': 'pass',
+    'import src.preprocess': 'import src.preprocess',
+    'import src.registry': 'import src.registry',
+    'registry ready (numpy)': "from src.registry import ComponentRegistry; ComponentRegistry(backend='numpy').load_all()",
+    'registry ready (sklearn)': "from src.registry import ComponentRegistry; ComponentRegistry(backend='sklearn').load_all()",
+    'import app/api.py': API_IMPORT,
+    'import src.models': 'import src.models',
+}
+
+def time_scenario(statement, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def heaviest_imports(statement, top):
+    # -X importtime writes "self us | cumulative us | package" lines to stderr
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT,
+                          capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[1].isdigit():
+            rows.append((int(parts[1]), parts[2]))
+    return sorted(rows, reverse=True)[:top]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time process start-up to first-ready for each entry point")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--top', type=int, default=0, help="also list the N slowest imports of app/api.py")
+    args = parser.parse_args()
+    for name, statement in SCENARIOS.items():
+        try:
+            print(f"{name:<28} {time_scenario(statement, args.repeats):>6.2f}s")
+        except subprocess.CalledProcessError:
+            print(f"{name:<28} failed (missing dependency or trained model?)")
+    if args.top:
+        for cumulative, module in heaviest_imports(API_IMPORT, args.top):
+            print(f"  {cumulative / 1e6:>6.2f}s  {module}")
@@ -0,0 +1,29 @@
+import random
+
+# Vocabulary for synthetic airline tweets; mixes aspect keywords, mentions, urls,
+# numbers, emoji and (for Arabic) diacritics so every preprocessing branch is exercised
+EN_WORDS = [
+    'flight', 'delayed', 'delay', 'cancelled', 'staff', 'crew', 'rude', 'helpful', 'great', 'terrible',
+    'bag', 'luggage', 'lost', 'refund', 'ticket', 'price', 'expensive', 'seat', 'late', 'time',
+    'service', 'agent', 'phone', 'hours', 'waiting', 'thanks', 'love', 'worst', 'best', 'again',
+    'the', 'and', 'was', 'is', 'my', 'you', 'to', 'for', 'on', 'not', 'never', 'flying', 'airline',
+]
+EN_EXTRAS = ['@united', '@AmericanAir', 'http://t.co/abc123', '#fail', '!!!', '2', '45min', '😡', '👍', 'Flight!']
+
+AR_WORDS = [
+    'الرحلة', 'رحلة', 'تاخير', 'تأخير', 'الغاء', 'إلغاء', 'طيارة', 'مقعد', 'وقت', 'جدول',
+    'خدمة', 'موظف', 'دعم', 'مساعدة', 'اتصال', 'سعر', 'تذكرة', 'غالي', 'رخيص', 'فلوس',
+    'حقيبة', 'شنطة', 'أمتعة', 'ضياع', 'ممتازة', 'سيئة', 'جميلة', 'شكرا', 'في', 'من', 'على',
+]
+AR_EXTRAS = ['@saudia', 'http://t.co/xyz', '٣', '!!', 'هههههه', 'رِحْلَةٌ', 'مـــمتاز', 'ى', 'ؤ', '😍']
+
+def synthetic_tweets(lang='en', n=1000, seed=42, min_words=3, max_words=30):
+    """Generate `n` reproducible synthetic tweets for `lang` ('en' or 'ar')."""
+    rng = random.Random(seed)
+    words, extras = (EN_WORDS, EN_EXTRAS) if lang == 'en' else (AR_WORDS, AR_EXTRAS)
+    tweets = []
+    for _ in range(n):
+        length = rng.randint(min_words, max_words)
+        tokens = [rng.choice(extras) if rng.random() < 0.15 else rng.choice(words) for _ in range(length)]
+        tweets.append(" ".join(tokens))
+    return tweets
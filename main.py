@@ -1,11 +1,22 @@
 import pandas as pd
 import os
-from src.preprocess import TextPreprocessor
+from src.preprocess import parallel_preprocess, STEM_CACHE
 from src.eda import generate_eda_reports
-from src.models import SentimentModel, plot_confusion_matrix
+from src.models import train_models, compare_models, fit_features, plot_confusion_matrix, VECTORIZER_PARAMS
+from src.pipeline_cache import PipelineCache
 from src.aspect import AspectExtractor
 import json
 
+# Preprocessing parallelism; PREPROCESS_JOBS=1 runs serially for debugging
+PREPROCESS_JOBS = int(os.environ.get('PREPROCESS_JOBS', os.cpu_count() or 1))
+PREPROCESS_CHUNKSIZE = int(os.environ.get('PREPROCESS_CHUNKSIZE', 10000))
+# Model types are trained concurrently on one shared TF-IDF matrix; TRAIN_JOBS=1 trains serially
+TRAIN_JOBS = int(os.environ.get('TRAIN_JOBS', 0)) or None
+# Metric used to pick the model behind the '<lang>_model' alias: accuracy or macro_f1
+SELECTION_METRIC = os.environ.get('SELECTION_METRIC', 'accuracy')
+# Cleaned text and TF-IDF features are reused across runs; PIPELINE_CACHE=0 recomputes them
+PIPELINE_CACHE = os.environ.get('PIPELINE_CACHE', '1') == '1'
+
 def main():
     # 1. Load Data
     print("Loading data...")
@@ -13,8 +24,18 @@ def main():
     
     # 2. Cleaning & Preprocessing
     print("Preprocessing data...")
-    preprocessor = TextPreprocessor(lang='en')
-    raw_df['cleaned_text'] = raw_df['text'].apply(preprocessor.preprocess)
+    cache = PipelineCache(enabled=PIPELINE_CACHE)
+    cleaned_key = cache.cleaned_key('data/raw/tweets.csv', 'text', 'en')
+
+    def clean():
+        cleaned = parallel_preprocess(raw_df['text'], lang='en',
+                                      n_jobs=PREPROCESS_JOBS, chunksize=PREPROCESS_CHUNKSIZE)
+        print(f"Stem cache: {STEM_CACHE.stats()}")
+        # Persist the stem cache so API workers start warm (only when it was actually rebuilt)
+        STEM_CACHE.save('models/en_stem_cache.json')
+        return cleaned
+
+    raw_df['cleaned_text'] = cache.cleaned_text(cleaned_key, clean)
     
     # 3. EDA
     print("Generating EDA reports...")
@@ -23,28 +44,41 @@ def main():
     # 4. Aspect Extraction
     print("Extracting aspects...")
     aspect_extractor = AspectExtractor(language='en')
-    raw_df['aspect'] = raw_df['text'].apply(aspect_extractor.detect_aspect)
+    raw_df['aspect'] = aspect_extractor.detect_aspects_batch(raw_df['text'])[0]
     
     # 5. Model Training (Multiple Models)
     print("Training Models...")
     model_types = ['logistic', 'mlp'] # Logistic (Classical) and MLP (Deep Learning)
-    for m_type in model_types:
-        print(f"Training {m_type} model...")
-        model = SentimentModel(model_type=m_type)
-        metrics, y_test, y_pred = model.train(raw_df['cleaned_text'], raw_df['airline_sentiment'])
-        print(f"{m_type} Accuracy: {metrics['accuracy']:.4f}")
+    features = cache.features(cache.features_key(cleaned_key, VECTORIZER_PARAMS),
+                              lambda: fit_features(raw_df['cleaned_text']))
+    print(f"Pipeline cache: {cache.stats()}")
+    results = train_models(raw_df['cleaned_text'], raw_df['airline_sentiment'], model_types, n_jobs=TRAIN_JOBS,
+                           features=features)
+    labels = sorted(raw_df['airline_sentiment'].unique())
+    for m_type, (model, metrics, y_test, y_pred) in results.items():
+        print(f"{m_type} Accuracy: {metrics['accuracy']:.4f} (fit {metrics['fit_seconds']:.1f}s)")
         
-        # Save metrics for the best one or just save both
         with open(f'reports/en/metrics_{m_type}.json', 'w') as f:
             json.dump(metrics['report'], f, indent=4)
         
-        labels = sorted(raw_df['airline_sentiment'].unique())
         plot_confusion_matrix(metrics['confusion_matrix'], labels, f'reports/en/confusion_matrix_{m_type}.png')
         
-        model.save(f'models/en_{m_type}_model.joblib', f'models/en_{m_type}_vectorizer.joblib')
+        manifest = model.save_artifact(f'en_{m_type}', lang='en',
+                                       metadata={'accuracy': metrics['accuracy'], 'trained_on': 'data/raw/tweets.csv'})
+        print(f"Saved {manifest['name']} v{manifest['version']}")
     
     # 7. Model Selection & Saving
-    model.save('models/en_model.joblib', 'models/en_vectorizer.joblib')
+    comparison = compare_models(results, metric=SELECTION_METRIC)
+    with open('reports/en/model_comparison.json', 'w') as f:
+        json.dump(comparison, f, indent=4)
+    for m_type, row in comparison['models'].items():
+        print(f"{m_type:<10} accuracy={row['accuracy']:.4f} macro_f1={row['macro_f1']:.4f} "
+              f"fit={row['fit_seconds']:.1f}s predict={row['predict_rows_per_second']:.0f} rows/s")
+    best = comparison['best']
+    print(f"Selected {best} by {SELECTION_METRIC}")
+    # Alias manifest only; its components are already in the store
+    results[best][0].save_artifact('en_model', lang='en',
+                                   metadata={'alias_of': f'en_{best}', 'selected_by': SELECTION_METRIC})
     
     # 8. Output Final CSV
     print("Saving final output...")
@@ -1,11 +1,22 @@
 import pandas as pd
 import os
-from src.preprocess import TextPreprocessor
+from src.preprocess import parallel_preprocess
 from src.eda import generate_eda_reports
-from src.models import SentimentModel, plot_confusion_matrix
+from src.models import train_models, compare_models, fit_features, plot_confusion_matrix, VECTORIZER_PARAMS
+from src.pipeline_cache import PipelineCache
 from src.aspect import AspectExtractor
 import json
 
+# Preprocessing parallelism; PREPROCESS_JOBS=1 runs serially for debugging
+PREPROCESS_JOBS = int(os.environ.get('PREPROCESS_JOBS', os.cpu_count() or 1))
+PREPROCESS_CHUNKSIZE = int(os.environ.get('PREPROCESS_CHUNKSIZE', 10000))
+# Model types are trained concurrently on one shared TF-IDF matrix; TRAIN_JOBS=1 trains serially
+TRAIN_JOBS = int(os.environ.get('TRAIN_JOBS', 0)) or None
+# Metric used to pick the model behind the '<lang>_model' alias: accuracy or macro_f1
+SELECTION_METRIC = os.environ.get('SELECTION_METRIC', 'accuracy')
+# Cleaned text and TF-IDF features are reused across runs; PIPELINE_CACHE=0 recomputes them
+PIPELINE_CACHE = os.environ.get('PIPELINE_CACHE', '1') == '1'
+
 def main():
     # 1. Load Data
     print("Loading Arabic data...")
@@ -17,8 +28,11 @@ def main():
     
     # 2. Cleaning & Preprocessing
     print("Preprocessing Arabic data...")
-    preprocessor = TextPreprocessor(lang='ar')
-    raw_df['cleaned_text'] = raw_df['text'].apply(preprocessor.preprocess)
+    cache = PipelineCache(enabled=PIPELINE_CACHE)
+    cleaned_key = cache.cleaned_key('data/raw/arabic_samples.csv', 'text', 'ar')
+    raw_df['cleaned_text'] = cache.cleaned_text(
+        cleaned_key, lambda: parallel_preprocess(raw_df['text'], lang='ar',
+                                                 n_jobs=PREPROCESS_JOBS, chunksize=PREPROCESS_CHUNKSIZE))
     
     # 3. EDA
     print("Generating Arabic EDA reports...")
@@ -27,27 +41,41 @@ def main():
     # 4. Aspect Extraction
     print("Extracting Arabic aspects...")
     aspect_extractor = AspectExtractor(language='ar')
-    raw_df['aspect'] = raw_df['text'].apply(aspect_extractor.detect_aspect)
+    raw_df['aspect'] = aspect_extractor.detect_aspects_batch(raw_df['text'])[0]
     
     # 5. Model Training (Multiple Models)
     print("Training Arabic Models...")
     model_types = ['logistic', 'mlp']
-    for m_type in model_types:
-        print(f"Training {m_type} model...")
-        model = SentimentModel(model_type=m_type)
-        metrics, y_test, y_pred = model.train(raw_df['cleaned_text'], raw_df['sentiment'])
-        print(f"{m_type} Accuracy: {metrics['accuracy']:.4f}")
+    features = cache.features(cache.features_key(cleaned_key, VECTORIZER_PARAMS),
+                              lambda: fit_features(raw_df['cleaned_text']))
+    print(f"Pipeline cache: {cache.stats()}")
+    results = train_models(raw_df['cleaned_text'], raw_df['sentiment'], model_types, n_jobs=TRAIN_JOBS,
+                           features=features)
+    for m_type, (model, metrics, y_test, y_pred) in results.items():
+        print(f"{m_type} Accuracy: {metrics['accuracy']:.4f} (fit {metrics['fit_seconds']:.1f}s)")
         
         with open(f'reports/ar/metrics_{m_type}.json', 'w') as f:
             json.dump(metrics['report'], f, indent=4)
         
-        model.save(f'models/ar_{m_type}_model.joblib', f'models/ar_{m_type}_vectorizer.joblib')
+        manifest = model.save_artifact(f'ar_{m_type}', lang='ar',
+                                       metadata={'accuracy': metrics['accuracy'], 'trained_on': 'data/raw/arabic_samples.csv'})
+        print(f"Saved {manifest['name']} v{manifest['version']}")
         
     labels = sorted(raw_df['sentiment'].unique())
     #plot_confusion_matrix(metrics['confusion_matrix'], labels, 'reports/ar/confusion_matrix.png')
     
     # 7. Model Selection & Saving
-    model.save('models/ar_model.joblib', 'models/ar_vectorizer.joblib')
+    comparison = compare_models(results, metric=SELECTION_METRIC)
+    with open('reports/ar/model_comparison.json', 'w') as f:
+        json.dump(comparison, f, indent=4)
+    for m_type, row in comparison['models'].items():
+        print(f"{m_type:<10} accuracy={row['accuracy']:.4f} macro_f1={row['macro_f1']:.4f} "
+              f"fit={row['fit_seconds']:.1f}s predict={row['predict_rows_per_second']:.0f} rows/s")
+    best = comparison['best']
+    print(f"Selected {best} by {SELECTION_METRIC}")
+    # Alias manifest only; its components are already in the store
+    results[best][0].save_artifact('ar_model', lang='ar',
+                                   metadata={'alias_of': f'ar_{best}', 'selected_by': SELECTION_METRIC})
     
     # 8. Output Final CSV
     print("Saving Arabic final output...")
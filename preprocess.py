@@ -2,15 +2,36 @@ import pandas as pd
 import re
 import string
 import nltk
-from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 import emoji
+from src.resources import load_stopwords
+from src.tables import TableWriter, write_table, table_path
 
-# Download necessary NLTK data
-nltk.download('stopwords')
-nltk.download('wordnet')
-nltk.download('omw-1.4')
-nltk.download('punkt')
+# NLTK data is checked on first use and only downloaded when missing, instead of
+# four unconditional downloads every time this module is imported
+NLTK_RESOURCES = {
+    'wordnet': 'corpora/wordnet',
+    'omw-1.4': 'corpora/omw-1.4',
+    'punkt': 'tokenizers/punkt',
+}
+_stop_words = None
+_lemmatizer = None
+
+def ensure_nltk_resources():
+    for package, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(package)
+
+def _text_resources():
+    # Stop words and the lemmatizer are built once per process, not once per text
+    global _stop_words, _lemmatizer
+    if _lemmatizer is None:
+        ensure_nltk_resources()
+        _stop_words = load_stopwords('english') | load_stopwords('arabic')
+        _lemmatizer = WordNetLemmatizer()
+    return _stop_words, _lemmatizer
 
 def clean_text(text):
     if not isinstance(text, str):
@@ -48,40 +69,85 @@ def clean_text(text):
     text = text.translate(str.maketrans('', '', string.punctuation.replace('_', '')))
     
     # 8. Tokenization
+    stop_words, lemmatizer = _text_resources()
     tokens = nltk.word_tokenize(text)
     
     # 9. Stopwords removal (English & Arabic)
-    stop_words = set(stopwords.words('english')).union(set(stopwords.words('arabic')))
     tokens = [w for w in tokens if w not in stop_words]
     
     # 10. Lemmatization (English)
-    lemmatizer = WordNetLemmatizer()
     tokens = [lemmatizer.lemmatize(w) for w in tokens]
     
     return " ".join(tokens)
 
-def run_preprocessing(input_path, output_path):
+def drop_short_texts(df):
+    # Remove rows where cleaned_text is empty or too short
+    return df[df['cleaned_text'].str.strip().apply(len) > 2]
+
+def preprocess_frame(df):
+    """Add cleaned_text to a raw DataFrame and drop rows whose cleaned text is too short."""
+    df = df.copy()
+    df['cleaned_text'] = df['text'].apply(clean_text)
+    return drop_short_texts(df)
+
+def _stream_to_table(input_path, output_path, encoding, chunksize, usecols):
+    total = kept = 0
+    reader = pd.read_csv(input_path, encoding=encoding, chunksize=chunksize, usecols=usecols)
+    # The writer (re)creates the output; each chunk is appended to it (a row group for Parquet)
+    with TableWriter(output_path) as writer:
+        for chunk in reader:
+            chunk['cleaned_text'] = chunk['text'].apply(clean_text)
+            total += len(chunk)
+            chunk = drop_short_texts(chunk)
+            kept += len(chunk)
+            writer.write(chunk)
+            print(f"  processed {total} rows...")
+    return total, kept
+
+def run_preprocessing_streaming(input_path, output_path, chunksize=50000, usecols=None):
+    print(f"Streaming data from {input_path} in chunks of {chunksize} rows...")
     try:
-        print(f"Loading data from {input_path}...")
-        df = pd.read_csv(input_path, encoding='utf-8')
+        try:
+            total, kept = _stream_to_table(input_path, output_path, 'utf-8', chunksize, usecols)
+        except UnicodeDecodeError:
+            # Restart from the top; the first chunk overwrites whatever was already written
+            print("UTF-8 decode failed, trying ISO-8859-1")
+            total, kept = _stream_to_table(input_path, output_path, 'ISO-8859-1', chunksize, usecols)
+        print(f"Removed {total - kept} rows due to empty/short cleaned text.")
+        print(f"Saved cleaned data to {output_path}.")
+        print("Done.")
+    except Exception as e:
+        # The writer has already removed the partial output
+        print(f"Error during preprocessing: {e}")
+        raise
+
+def load_raw(input_path, usecols=None):
+    try:
+        return pd.read_csv(input_path, encoding='utf-8', usecols=usecols)
     except UnicodeDecodeError:
         print("UTF-8 decode failed, trying ISO-8859-1")
-        df = pd.read_csv(input_path, encoding='ISO-8859-1')
+        return pd.read_csv(input_path, encoding='ISO-8859-1', usecols=usecols)
+
+def run_preprocessing(input_path, output_path, chunksize=None, usecols=None):
+    # Chunked mode keeps peak memory bounded by `chunksize` instead of the file size
+    if chunksize:
+        return run_preprocessing_streaming(input_path, output_path, chunksize, usecols)
+
+    try:
+        print(f"Loading data from {input_path}...")
+        df = load_raw(input_path, usecols=usecols)
     except Exception as e:
         print(f"Error loading CSV: {e}")
         return
 
     try:
         print("Preprocessing text...")
-        df['cleaned_text'] = df['text'].apply(clean_text)
-        
-        # Remove rows where cleaned_text is empty or too short
         initial_len = len(df)
-        df = df[df['cleaned_text'].str.strip().apply(len) > 2]
+        df = preprocess_frame(df)
         print(f"Removed {initial_len - len(df)} rows due to empty/short cleaned text.")
         
         print(f"Saving cleaned data to {output_path}...")
-        df.to_csv(output_path, index=False, encoding='utf-8')
+        write_table(df, output_path)
         print("Done.")
     except Exception as e:
         print(f"Error during preprocessing: {e}")
@@ -94,14 +160,16 @@ if __name__ == "__main__":
     base_path = r"d:\Desktop\Rivoo\Sentiment Analysis\data\raw"
     output_base = r"d:\Desktop\Rivoo\Sentiment Analysis\data"
     os.makedirs(output_base, exist_ok=True)
+    # Set STREAM_CHUNKSIZE (rows) to process large exports chunk by chunk
+    chunksize = int(os.environ.get('STREAM_CHUNKSIZE', 0)) or None
     
     # Process Tweets
     tweets_path = os.path.join(base_path, "tweets.csv")
     if os.path.exists(tweets_path):
-        run_preprocessing(tweets_path, os.path.join(output_base, "tweets_cleaned.csv"))
+        run_preprocessing(tweets_path, table_path(output_base, "tweets_cleaned"), chunksize=chunksize)
     
     # Process Arabic Samples
     arabic_path = os.path.join(base_path, "arabic_samples.csv")
     if os.path.exists(arabic_path):
-        run_preprocessing(arabic_path, os.path.join(output_base, "arabic_cleaned.csv"))
+        run_preprocessing(arabic_path, table_path(output_base, "arabic_cleaned"), chunksize=chunksize)
 
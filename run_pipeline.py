@@ -0,0 +1,41 @@
+import argparse
+import os
+from src.pipeline import Stage, Pipeline, print_report
+from src.tables import write_table, table_path, EXPORT_CSV
+from preprocess import load_raw, preprocess_frame
+from sentiment_analysis import score_sentiment
+from topic_modeling import assign_topics
+from trend_analysis import report_trends
+from visualize import plot_visuals
+
+def build_pipeline(raw_path, data_dir, reports_dir, n_topics=5, run_dir=None):
+    # preprocess -> VADER -> topics -> {trends, visuals, export}, DataFrames passed in memory
+    visuals_dir = os.path.join(reports_dir, 'visuals')
+    trends_dir = os.path.join(reports_dir, 'trends')
+    final_path = table_path(data_dir, 'tweets_final')
+    stages = [
+        Stage('load', load_raw, params={'input_path': raw_path}, files=[raw_path]),
+        Stage('preprocess', preprocess_frame, deps=['load']),
+        Stage('sentiment', score_sentiment, deps=['preprocess']),
+        Stage('topics', assign_topics, deps=['sentiment'], params={'n_topics': n_topics}),
+        Stage('trends', report_trends, deps=['topics'], params={'output_dir': trends_dir},
+              outputs=[os.path.join(trends_dir, 'daily_sentiment.csv'),
+                       os.path.join(trends_dir, 'airline_sentiment.csv')]),
+        Stage('visualize', plot_visuals, deps=['topics'], params={'output_dir': visuals_dir},
+              outputs=[os.path.join(visuals_dir, 'sentiment_distribution.png')]),
+        Stage('export', write_table, deps=['topics'], params={'path': final_path, 'export_csv': EXPORT_CSV},
+              outputs=[final_path]),
+    ]
+    return Pipeline(stages, **({'run_dir': run_dir} if run_dir else {}))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run preprocess -> sentiment -> topics -> trends/visuals in one process")
+    parser.add_argument('--raw', default=os.path.join('data', 'raw', 'tweets.csv'))
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--reports-dir', default='reports')
+    parser.add_argument('--n-topics', type=int, default=5)
+    parser.add_argument('--run-dir', default=None, help="stage outputs and run state (default: cache/runs)")
+    parser.add_argument('--force', nargs='*', default=[], help="stages to rerun even if unchanged")
+    args = parser.parse_args()
+    pipeline = build_pipeline(args.raw, args.data_dir, args.reports_dir, args.n_topics, args.run_dir)
+    print_report(pipeline.run(force=set(args.force)))
@@ -1,9 +1,16 @@
 import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import os
+from src.tables import read_table, write_table, find_table, table_path
 
 analyzer = SentimentIntensityAnalyzer()
 
+# Scoring parallelism; VADER_JOBS=1 scores serially in this process
+VADER_JOBS = int(os.environ.get('VADER_JOBS', os.cpu_count() or 1))
+VADER_CHUNKSIZE = int(os.environ.get('VADER_CHUNKSIZE', 5000))
+
 def get_vader_sentiment(text):
     if not isinstance(text, str) or text == "":
         return "neutral", 0.0
@@ -18,36 +25,77 @@ def get_vader_sentiment(text):
     else:
         return "neutral", compound
 
-def process_sentiment(file_path, output_path):
-    print(f"Loading {file_path}...")
-    df = pd.read_csv(file_path)
-    
+# One analyzer per worker process, built once by the pool initializer
+_worker_analyzer = None
+
+def _init_worker():
+    global _worker_analyzer
+    _worker_analyzer = SentimentIntensityAnalyzer()
+
+def _compound_chunk(texts):
+    return [_worker_analyzer.polarity_scores(t)['compound'] for t in texts]
+
+def vader_scores(texts, n_jobs=VADER_JOBS, chunksize=VADER_CHUNKSIZE):
+    """Array version of `get_vader_sentiment`: returns (labels, compounds) for a sequence of texts.
+
+    Each distinct text is scored once; with n_jobs > 1 the distinct texts are split
+    into chunks across a process pool. Output matches `get_vader_sentiment` row for row.
+    """
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+    uniques = list(uniques)
+    # Non-strings and empty strings score ("neutral", 0.0) without calling VADER
+    scorable = [i for i, t in enumerate(uniques) if isinstance(t, str) and t != ""]
+    to_score = [uniques[i] for i in scorable]
+
+    if n_jobs <= 1 or len(to_score) <= chunksize:
+        compounds = [analyzer.polarity_scores(t)['compound'] for t in to_score]
+    else:
+        chunks = [to_score[i:i + chunksize] for i in range(0, len(to_score), chunksize)]
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as pool:
+            compounds = [c for chunk in pool.map(_compound_chunk, chunks) for c in chunk]
+
+    unique_compounds = np.zeros(len(uniques) + 1)
+    unique_compounds[scorable] = compounds
+    # Missing values have code -1, which indexes the trailing 0.0
+    compound = unique_compounds[codes]
+    labels = np.select([compound >= 0.05, compound <= -0.05], ["positive", "negative"], default="neutral")
+    return labels.astype(object), compound
+
+def score_sentiment(df, n_jobs=VADER_JOBS, chunksize=VADER_CHUNKSIZE):
+    """Add the VADER sentiment columns to a cleaned DataFrame (in place); returns it."""
     # We use 'cleaned_text' for analysis
-    print("Analyzing sentiment...")
-    results = df['cleaned_text'].apply(get_vader_sentiment)
+    labels, compound = vader_scores(df['cleaned_text'], n_jobs=n_jobs, chunksize=chunksize)
     
-    df['sentiment_vader'] = [r[0] for r in results]
-    df['sentiment_score'] = [r[1] for r in results]
+    df['sentiment_vader'] = labels
+    df['sentiment_score'] = compound
     
     # Confidence score (normalized to 0-1)
-    df['confidence_score'] = df['sentiment_score'].abs()
+    df['confidence_score'] = np.abs(compound)
     
     # Map to final sentiment label
     df['final_sentiment'] = df['sentiment_vader']
+    return df
+
+def process_sentiment(file_path, output_path, n_jobs=VADER_JOBS, chunksize=VADER_CHUNKSIZE):
+    print(f"Loading {file_path}...")
+    df = read_table(file_path)
+    
+    print("Analyzing sentiment...")
+    score_sentiment(df, n_jobs=n_jobs, chunksize=chunksize)
     
     print(f"Saving results to {output_path}...")
-    df.to_csv(output_path, index=False)
+    write_table(df, output_path)
     print("Done.")
 
 if __name__ == "__main__":
     base_path = r"d:\Desktop\Rivoo\Sentiment Analysis\data"
     
     # Process Tweets
-    tweets_clean = os.path.join(base_path, "tweets_cleaned.csv")
-    if os.path.exists(tweets_clean):
-        process_sentiment(tweets_clean, os.path.join(base_path, "tweets_sentiment.csv"))
+    tweets_clean = find_table(base_path, "tweets_cleaned")
+    if tweets_clean:
+        process_sentiment(tweets_clean, table_path(base_path, "tweets_sentiment"))
     
     # Process Arabic (Fallback for demo)
-    arabic_clean = os.path.join(base_path, "arabic_cleaned.csv")
-    if os.path.exists(arabic_clean):
-        process_sentiment(arabic_clean, os.path.join(base_path, "arabic_sentiment.csv"))
+    arabic_clean = find_table(base_path, "arabic_cleaned")
+    if arabic_clean:
+        process_sentiment(arabic_clean, table_path(base_path, "arabic_sentiment"))
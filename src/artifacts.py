@@ -0,0 +1,219 @@
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from src.preprocess import TextPreprocessor
+from src.runtime import NumpyModel, export_arrays, arrays_digest, arrays_to_bytes
+
+# Content-addressed store: every component is written once under objects/<sha256>.joblib
+# and each pipeline version is a small JSON manifest under pipelines/<name>/v<N>.json
+STORE_DIR = 'models/store'
+FORMAT_VERSION = 1
+
+# joblib (and with it scikit-learn, on unpickling) is only imported by the sklearn
+# backend and the store writers; the numpy backend starts without either
+
+def _put_object(obj, store_dir):
+    import joblib
+    buf = io.BytesIO()
+    joblib.dump(obj, buf)
+    data = buf.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(store_dir, 'objects', f'{digest}.joblib')
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return digest
+
+def _get_object(digest, store_dir):
+    import joblib
+    return joblib.load(os.path.join(store_dir, 'objects', f'{digest}.joblib'))
+
+def _put_runtime(vectorizer, model, store_dir):
+    # NumPy-only export for the 'numpy' backend; None when the pipeline has no exporter
+    try:
+        arrays = export_arrays(vectorizer, model)
+    except ValueError:
+        return None
+    digest = arrays_digest(arrays)
+    path = os.path.join(store_dir, 'objects', f'{digest}.npz')
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(arrays_to_bytes(arrays))
+        os.replace(tmp_path, path)
+    return digest
+
+def list_versions(name, store_dir=STORE_DIR):
+    pipeline_dir = os.path.join(store_dir, 'pipelines', name)
+    if not os.path.isdir(pipeline_dir):
+        return []
+    return sorted(int(f[1:-5]) for f in os.listdir(pipeline_dir) if f.startswith('v') and f.endswith('.json'))
+
+def read_manifest(name, version=None, store_dir=STORE_DIR):
+    versions = list_versions(name, store_dir)
+    if not versions:
+        raise FileNotFoundError(f"No pipeline named '{name}' in {store_dir}")
+    version = versions[-1] if version is None else version
+    with open(os.path.join(store_dir, 'pipelines', name, f'v{version}.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def save_pipeline(name, vectorizer, model, lang, model_type, metadata=None, store_dir=STORE_DIR):
+    """Store a trained pipeline as a new version of `name` and return its manifest.
+
+    Components already in the store are not written again. If the latest version has
+    exactly the same components, it is returned instead of creating a new version.
+    """
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'name': name,
+        'model_type': model_type,
+        'preprocessor': {'lang': lang},
+        'labels': [str(c) for c in getattr(model, 'classes_', [])],
+        'components': {
+            'vectorizer': _put_object(vectorizer, store_dir),
+            'classifier': _put_object(model, store_dir),
+        },
+    }
+    runtime = _put_runtime(vectorizer, model, store_dir)
+    if runtime:
+        manifest['components']['runtime'] = runtime
+
+    versions = list_versions(name, store_dir)
+    if versions:
+        latest = read_manifest(name, versions[-1], store_dir)
+        if all(latest.get(k) == v for k, v in manifest.items()):
+            return latest
+
+    manifest['version'] = versions[-1] + 1 if versions else 1
+    manifest['created_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    manifest['metadata'] = metadata or {}
+    pipeline_dir = os.path.join(store_dir, 'pipelines', name)
+    os.makedirs(pipeline_dir, exist_ok=True)
+    with open(os.path.join(pipeline_dir, f"v{manifest['version']}.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+def _lap(timings, stage, start):
+    now = time.perf_counter()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + now - start
+    return now
+
+class Predictor:
+    """Ready-to-run pipeline: raw text -> TextPreprocessor -> vectorizer -> classifier."""
+
+    def __init__(self, vectorizer, model, preprocessor, manifest=None, runtime=None):
+        self.vectorizer = vectorizer
+        self.model = model
+        self.preprocessor = preprocessor
+        self.manifest = manifest or {}
+        # Optional NumpyModel; when set it replaces vectorizer + model at inference time
+        self.runtime = runtime
+        self.labels = list(getattr(runtime or model, 'classes_', []))
+
+    @property
+    def backend(self):
+        return 'numpy' if self.runtime is not None else 'sklearn'
+
+    @property
+    def lang(self):
+        return self.preprocessor.lang
+
+    @property
+    def version(self):
+        if not self.manifest:
+            return 'legacy'
+        return f"{self.manifest['name']}:v{self.manifest['version']}"
+
+    def predict_with_confidence(self, texts, cleaned=False, timings=None):
+        """Return (labels, max class probabilities or None) for a list of texts.
+
+        If `timings` is a dict, the seconds spent in each stage are added to it.
+        """
+        start = time.perf_counter()
+        if not cleaned:
+            texts = [self.preprocessor.preprocess(t) for t in texts]
+            start = _lap(timings, 'preprocess', start)
+        if self.runtime is not None:
+            # The NumPy runtime fuses vectorization and prediction
+            result = self.runtime.predict_with_confidence(texts)
+            _lap(timings, 'predict', start)
+            return result
+        vec = self.vectorizer.transform(texts)
+        start = _lap(timings, 'vectorize', start)
+        sentiments = self.model.predict(vec)
+        if hasattr(self.model, 'predict_proba'):
+            confidences = [float(c) for c in self.model.predict_proba(vec).max(axis=1)]
+        else:
+            confidences = [None] * len(sentiments)
+        _lap(timings, 'predict', start)
+        return sentiments, confidences
+
+    def predict(self, texts, cleaned=False):
+        return self.predict_with_confidence(texts, cleaned=cleaned)[0]
+
+def load_pipeline(name, version=None, store_dir=STORE_DIR, backend='sklearn'):
+    """Load a pipeline version (latest by default). backend='numpy' skips scikit-learn entirely."""
+    manifest = read_manifest(name, version, store_dir)
+    components = manifest['components']
+    if backend == 'numpy':
+        if 'runtime' not in components:
+            raise ValueError(f"Pipeline '{name}' has no NumPy runtime export")
+        runtime = NumpyModel.load(os.path.join(store_dir, 'objects', f"{components['runtime']}.npz"))
+        return Predictor(None, None, TextPreprocessor(**manifest['preprocessor']), manifest, runtime=runtime)
+    return Predictor(
+        vectorizer=_get_object(components['vectorizer'], store_dir),
+        model=_get_object(components['classifier'], store_dir),
+        preprocessor=TextPreprocessor(**manifest['preprocessor']),
+        manifest=manifest,
+    )
+
+def load_predictor(lang, model_type='logistic', store_dir=STORE_DIR, legacy_dir='models', backend='sklearn'):
+    """Load `<lang>_<model_type>` from the store, falling back to the legacy joblib file pair."""
+    try:
+        return load_pipeline(f'{lang}_{model_type}', store_dir=store_dir, backend=backend)
+    except FileNotFoundError:
+        import joblib
+        model = joblib.load(f'{legacy_dir}/{lang}_{model_type}_model.joblib')
+        vectorizer = joblib.load(f'{legacy_dir}/{lang}_{model_type}_vectorizer.joblib')
+        runtime = NumpyModel(export_arrays(vectorizer, model)) if backend == 'numpy' else None
+        return Predictor(vectorizer, model, TextPreprocessor(lang=lang), runtime=runtime)
+
+def import_legacy(legacy_dir='models', store_dir=STORE_DIR):
+    """Copy every legacy `<name>_model.joblib` / `<name>_vectorizer.joblib` pair into the store."""
+    import joblib
+    imported = {}
+    for lang in ['en', 'ar']:
+        for model_type in ['logistic', 'mlp', None]:
+            name = f'{lang}_{model_type}' if model_type else f'{lang}_model'
+            model_path = f'{legacy_dir}/{name}_model.joblib' if model_type else f'{legacy_dir}/{name}.joblib'
+            vec_path = (f'{legacy_dir}/{name}_vectorizer.joblib' if model_type
+                        else f'{legacy_dir}/{lang}_vectorizer.joblib')
+            if not (os.path.exists(model_path) and os.path.exists(vec_path)):
+                continue
+            model = joblib.load(model_path)
+            manifest = save_pipeline(name, joblib.load(vec_path), model, lang,
+                                     model_type or type(model).__name__,
+                                     metadata={'imported_from': [model_path, vec_path]}, store_dir=store_dir)
+            imported[name] = manifest['version']
+    return imported
+
+if __name__ == "__main__":
+    # python -m src.artifacts import-legacy
+    if sys.argv[1:] == ['import-legacy']:
+        for name, version in import_legacy().items():
+            print(f"{name}: v{version}")
+        objects_dir = os.path.join(STORE_DIR, 'objects')
+        if not os.path.isdir(objects_dir):
+            sys.exit("No legacy model files found.")
+        size = sum(os.path.getsize(os.path.join(objects_dir, f)) for f in os.listdir(objects_dir))
+        print(f"{len(os.listdir(objects_dir))} unique objects, {size / 1024:.0f} KB")
+    else:
+        print("usage: python -m src.artifacts import-legacy")
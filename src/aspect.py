@@ -1,37 +1,91 @@
+import json
 import re
+import numpy as np
+
+WORD_RE = re.compile(r'\w+')
+
+DEFAULT_ASPECT_KEYWORDS = {
+    'en': {
+        'Customer Service': ['service', 'staff', 'attendant', 'crew', 'support', 'help', 'call', 'agent', 'phone'],
+        'Flight Experience': ['flight', 'delay', 'time', 'cancelled', 'plane', 'seat', 'late', 'schedule', 'status'],
+        'Pricing': ['price', 'cost', 'ticket', 'fare', 'cheap', 'expensive', 'money', 'charge', 'refund'],
+        'Baggage': ['bag', 'luggage', 'suitcase', 'checked', 'lost']
+    },
+    # Arabic aspects (basic)
+    'ar': {
+        'خدمة العملاء': ['خدمه', 'موظف', 'دعم', 'مساعده', 'اتصال', 'رد', 'تواصل'],
+        'تجربة الرحلة': ['رحلة', 'تاخير', 'وقت', 'الغاء', 'طياره', 'مقعد', 'تاخر', 'جدول'],
+        'الأسعار': ['سعر', 'تكلفه', 'تذكره', 'رخيص', 'غالي', 'فلوس', 'دفع', 'استرداد'],
+        'الأمتعة': ['حقيبه', 'شنطه', 'امتعه', 'فقدان', 'ضياع']
+    }
+}
 
 class AspectExtractor:
-    def __init__(self, language='en'):
+    def __init__(self, language='en', aspect_keywords=None):
         self.language = language
-        if language == 'en':
-            self.aspect_keywords = {
-                'Customer Service': ['service', 'staff', 'attendant', 'crew', 'support', 'help', 'call', 'agent', 'phone'],
-                'Flight Experience': ['flight', 'delay', 'time', 'cancelled', 'plane', 'seat', 'late', 'schedule', 'status'],
-                'Pricing': ['price', 'cost', 'ticket', 'fare', 'cheap', 'expensive', 'money', 'charge', 'refund'],
-                'Baggage': ['bag', 'luggage', 'suitcase', 'checked', 'lost']
-            }
-        elif language == 'ar':
-            # Arabic aspects (basic)
-            self.aspect_keywords = {
-                'خدمة العملاء': ['خدمه', 'موظف', 'دعم', 'مساعده', 'اتصال', 'رد', 'تواصل'],
-                'تجربة الرحلة': ['رحلة', 'تاخير', 'وقت', 'الغاء', 'طياره', 'مقعد', 'تاخر', 'جدول'],
-                'الأسعار': ['سعر', 'تكلفه', 'تذكره', 'رخيص', 'غالي', 'فلوس', 'دفع', 'استرداد'],
-                'الأمتعة': ['حقيبه', 'شنطه', 'امتعه', 'فقدان', 'ضياع']
-            }
+        if aspect_keywords is None:
+            aspect_keywords = DEFAULT_ASPECT_KEYWORDS.get(language, {})
+        # Texts are lowercased before matching, so keywords are too
+        self.aspect_keywords = {aspect: [kw.lower() for kw in keywords]
+                                for aspect, keywords in aspect_keywords.items()}
+        self._compile()
+
+    @classmethod
+    def from_config(cls, path, language='en'):
+        """Load a taxonomy from a JSON file: {aspect: [keywords]} or {lang: {aspect: [keywords]}}."""
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        if isinstance(config.get(language), dict):
+            config = config[language]
+        return cls(language=language, aspect_keywords=config)
+
+    def _compile(self):
+        # Single-word keywords go into a hash index, so a text is scanned once no
+        # matter how many keywords there are. \bkw\b on a pure-\w keyword matches
+        # exactly when kw is one of the text's \w+ tokens.
+        self.aspects = list(self.aspect_keywords)
+        self._token_index = {}
+        self._phrase_patterns = []
+        for i, keywords in enumerate(self.aspect_keywords.values()):
+            for kw in keywords:
+                if WORD_RE.fullmatch(kw):
+                    self._token_index.setdefault(kw, []).append(i)
+                else:
+                    # Multi-word or punctuated keywords keep their own precompiled pattern. They are
+                    # literal text, and the boundaries also hold next to punctuation ('a.m.')
+                    self._phrase_patterns.append((re.compile(r'(?<!\w)' + re.escape(kw) + r'(?!\w)'), i))
+        self._keywords = frozenset(self._token_index)
+
+    def _count(self, text):
+        counts = [0] * len(self.aspects)
+        for token in self._keywords.intersection(WORD_RE.findall(text)):
+            for i in self._token_index[token]:
+                counts[i] += 1
+        for pattern, i in self._phrase_patterns:
+            if pattern.search(text):
+                counts[i] += 1
+        return counts
+
+    def _label(self, counts):
+        best = max(counts, default=0)
+        if best == 0:
+            return "General"
+        return self.aspects[counts.index(best)]
 
     def detect_aspect(self, text):
         if not isinstance(text, str):
             return "General"
-        
-        text = text.lower()
-        counts = {aspect: 0 for aspect in self.aspect_keywords}
-        
-        for aspect, keywords in self.aspect_keywords.items():
-            for kw in keywords:
-                if re.search(r'\b' + kw + r'\b', text):
-                    counts[aspect] += 1
-                    
-        max_aspect = max(counts, key=counts.get)
-        if counts[max_aspect] == 0:
-            return "General"
-        return max_aspect
+        return self._label(self._count(text.lower()))
+
+    def detect_aspects_batch(self, texts):
+        """Return (labels, hit counts of shape (n_texts, n_aspects)) with columns in `self.aspects` order."""
+        counts = np.zeros((len(texts), len(self.aspects)), dtype=np.int32)
+        labels = []
+        for row, text in enumerate(texts):
+            if not isinstance(text, str):
+                labels.append("General")
+                continue
+            row_counts = self._count(text.lower())
+            counts[row] = row_counts
+            labels.append(self._label(row_counts))
+        return labels, counts
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from src.metrics import Histogram, LATENCY_BUCKETS, BATCH_SIZE_BUCKETS
+
+class MicroBatcher:
+    """Coalesces concurrent single-item requests into one batch call per key (e.g. language).
+
+    A batch is flushed once it reaches `max_batch_size` items or its first item has
+    waited `max_wait` seconds. `process_batch(key, items)` is an async callable that
+    returns one result per item, in order. Flushed batches run as separate tasks, at
+    most `max_in_flight` at a time across all keys, while the next batch is collected;
+    items that arrive while every slot is busy join the next batch.
+    """
+
+    def __init__(self, process_batch, max_batch_size=64, max_wait=0.005, max_in_flight=1):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+        self._queues = {}
+        self._workers = {}
+        self._in_flight = set()
+        self._semaphore = None
+
+    async def submit(self, key, item):
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+            self._workers[key] = asyncio.create_task(self._run(key, queue))
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self, queue):
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self, key, queue):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        while True:
+            batch = await self._collect(queue)
+            await self._semaphore.acquire()
+            now = time.perf_counter()
+            for _, _, enqueued_at in batch:
+                self.queue_wait.observe(now - enqueued_at)
+            self.batch_sizes.observe(len(batch))
+            task = asyncio.create_task(self._dispatch(key, batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, key, batch):
+        try:
+            results = await self.process_batch(key, [item for item, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._semaphore.release()
+        for (_, future, _), result in zip(batch, results):
+            # Callers that disconnected have cancelled their future
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        # Batches already dispatched are finished so their callers get a result
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._queues.clear()
+        self._workers.clear()
+
+    def stats(self):
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'max_in_flight': self.max_in_flight,
+            'in_flight': len(self._in_flight),
+            'queued': {key: queue.qsize() for key, queue in self._queues.items()},
+            'batch_size': self.batch_sizes.snapshot(),
+            'queue_wait_seconds': self.queue_wait.snapshot(),
+        }
@@ -0,0 +1,119 @@
+import io
+import os
+import tempfile
+import threading
+import weakref
+from collections import Counter
+
+BULK_CHUNKSIZE = int(os.environ.get('BULK_CHUNKSIZE', 5000))
+EXCEL_SUFFIXES = ('.xlsx', '.xls')
+
+def _remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+def _is_excel(filename):
+    return filename.lower().endswith(EXCEL_SUFFIXES)
+
+def read_columns(data, filename):
+    """Column names of an uploaded CSV/Excel file, given its raw bytes."""
+    import pandas as pd
+    if _is_excel(filename):
+        return list(pd.read_excel(io.BytesIO(data), nrows=0).columns)
+    return list(pd.read_csv(io.BytesIO(data), nrows=0).columns)
+
+def iter_table_chunks(data, filename, chunksize=BULK_CHUNKSIZE):
+    """Yield (chunk, fraction of the file consumed) for an uploaded CSV/Excel file."""
+    import pandas as pd
+    if _is_excel(filename):
+        # Excel can't be read incrementally; load it once and hand it out in slices
+        df = pd.read_excel(io.BytesIO(data))
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize], min(start + chunksize, len(df)) / max(len(df), 1)
+        return
+    buf = io.BytesIO(data)
+    for chunk in pd.read_csv(buf, chunksize=chunksize):
+        # The parser reads ahead in blocks, so the buffer position is an estimate
+        yield chunk, buf.tell() / max(len(data), 1)
+
+def score_frame(registry, lang, df, text_col):
+    """Append sentiment, confidence and aspect columns to a chunk with one batched call per stage."""
+    texts = df[text_col].fillna('').astype(str)
+    cleaned = registry.preprocessors[lang].preprocess_batch(texts).tolist()
+    sentiments, confidences = registry.predictors[lang].predict_with_confidence(cleaned, cleaned=True)
+    aspects, _ = registry.aspect_extractors[lang].detect_aspects_batch(texts.tolist())
+    df = df.copy()
+    df['sentiment'] = list(sentiments)
+    df['confidence'] = confidences
+    df['aspect'] = aspects
+    return df
+
+class BulkJob:
+    """Scores an uploaded file chunk by chunk on a background thread.
+
+    Results are appended to a CSV on disk as each chunk finishes, so memory stays
+    bounded by the chunk size and the caller can poll `progress` without blocking.
+    The CSV is deleted when the job is discarded or garbage collected, e.g. when
+    the session holding it ends.
+    """
+
+    def __init__(self, registry, lang, data, filename, text_col, chunksize=BULK_CHUNKSIZE):
+        self.registry = registry
+        self.lang = lang
+        self.data = data
+        self.filename = filename
+        self.text_col = text_col
+        self.chunksize = chunksize
+        fd, self.output_path = tempfile.mkstemp(prefix='bulk_', suffix='.csv')
+        os.close(fd)
+        self._cleanup = weakref.finalize(self, _remove_file, self.output_path)
+        self.status = 'pending'
+        self.error = None
+        self.progress = 0.0
+        self.rows_done = 0
+        self.sentiment_counts = Counter()
+        self.aspect_counts = Counter()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='bulk-scoring', daemon=True)
+
+    def start(self):
+        self.status = 'running'
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def running(self):
+        return self.status == 'running'
+
+    def _run(self):
+        try:
+            header = True
+            for chunk, progress in iter_table_chunks(self.data, self.filename, self.chunksize):
+                if self._cancel.is_set():
+                    self.status = 'cancelled'
+                    self._cleanup()
+                    return
+                scored = score_frame(self.registry, self.lang, chunk, self.text_col)
+                scored.to_csv(self.output_path, mode='a', header=header, index=False)
+                header = False
+                self.sentiment_counts.update(scored['sentiment'])
+                self.aspect_counts.update(scored['aspect'])
+                self.rows_done += len(scored)
+                self.progress = min(progress, 1.0)
+            self.progress = 1.0
+            self.status = 'done'
+        except Exception as e:
+            self.error = str(e)
+            self.status = 'failed'
+        finally:
+            # The upload is no longer needed once scoring stops
+            self.data = None
+
+    def discard(self):
+        # A running job removes its own output once it sees the cancel flag
+        self.cancel()
+        if not self.running:
+            self._cleanup()
@@ -0,0 +1,75 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+class PredictionCache:
+    """Thread-safe LRU cache with a TTL for per-text analysis results."""
+
+    def __init__(self, maxsize=100000, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(lang, version, text):
+        # Whitespace-normalized raw text: collapsing whitespace changes neither the cleaned
+        # text nor the aspect, and keying before preprocessing lets hits skip it entirely
+        normalized = " ".join(text.split()) if isinstance(text, str) else ""
+        return (lang, version, hashlib.sha1(normalized.encode('utf-8')).hexdigest())
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, lang=None):
+        """Drop every entry, or only those of `lang`."""
+        with self._lock:
+            if lang is None:
+                self._data.clear()
+            else:
+                for key in [k for k in self._data if k[0] == lang]:
+                    del self._data[key]
+            self.invalidations += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,69 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from src.registry import get_registry
+from src.profiling import CallProfiler
+
+def _init_process_worker():
+    # Each worker process loads and warms up its own copy of the models once
+    get_registry().load_all()
+
+def score_texts(lang, texts, profile=False):
+    # Module-level so the process backend can pickle it by reference. Stage timings
+    # (and collapsed stacks in microseconds when profiled) travel back with the
+    # results, so metrics and profiling work for process workers too.
+    timings = {}
+    if not profile:
+        return get_registry().score(lang, texts, timings=timings), timings, None
+    with CallProfiler() as profiler:
+        results = get_registry().score(lang, texts, timings=timings)
+    return results, timings, dict(profiler.samples)
+
+class AnalysisExecutor:
+    """Runs CPU-bound scoring off the event loop with bounded concurrency.
+
+    kind='thread' shares the in-process registry; kind='process' gives every worker
+    its own preloaded registry to sidestep the GIL; kind='inline' runs on the loop.
+    """
+
+    def __init__(self, kind='thread', workers=None, max_concurrency=None):
+        if kind not in ('inline', 'thread', 'process'):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers
+        self._semaphore = None
+        self._pool = self._make_pool()
+
+    def _make_pool(self):
+        if self.kind == 'thread':
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='analysis')
+        if self.kind == 'process':
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_process_worker)
+        return None
+
+    async def run(self, lang, texts, profile=False):
+        if self._pool is None:
+            return score_texts(lang, texts, profile)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Excess calls wait here instead of piling up inside the pool
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, score_texts, lang, texts, profile)
+
+    def restart(self):
+        """Replace the pool, e.g. so process workers pick up reloaded models."""
+        old_pool, self._pool = self._pool, self._make_pool()
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+    def stats(self):
+        return {
+            'kind': self.kind,
+            'workers': self.workers,
+            'max_concurrency': self.max_concurrency,
+        }
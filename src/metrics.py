@@ -0,0 +1,126 @@
+import bisect
+import threading
+
+# Default bucket upper bounds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+class Histogram:
+    """Fixed-bucket histogram; `snapshot` reports cumulative counts per upper bound."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = 0
+        buckets = {}
+        for bound, n in zip(self.buckets + (float('inf'),), counts):
+            cumulative += n
+            buckets['+Inf' if bound == float('inf') else str(bound)] = cumulative
+        return {'buckets': buckets, 'sum': total, 'count': count, 'mean': total / count if count else 0.0}
+
+TEXT_LENGTH_BUCKETS = (10, 20, 40, 80, 140, 280, 560, 1000, 5000)
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+class MetricFamily:
+    """A named metric with one child (Counter or Histogram) per label combination."""
+
+    def __init__(self, name, help_text, kind, labelnames=(), buckets=None):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = Histogram(self.buckets) if self.kind == 'histogram' else Counter()
+                    self._children[values] = child
+        return child
+
+    def attach(self, child, *values):
+        """Expose an existing Histogram/Counter under this family."""
+        with self._lock:
+            self._children[values] = child
+
+    def render(self):
+        # Counter samples end in _total, and the HELP/TYPE lines must name the sample
+        name = f'{self.name}_total' if self.kind == 'counter' else self.name
+        lines = [f'# HELP {name} {self.help}', f'# TYPE {name} {self.kind}']
+        for values, child in sorted(self._children.items()):
+            labels = list(zip(self.labelnames, values))
+            if self.kind == 'counter':
+                lines.append(f'{name}{_format_labels(labels)} {child.value}')
+                continue
+            snapshot = child.snapshot()
+            for bound, count in snapshot['buckets'].items():
+                lines.append(f'{self.name}_bucket{_format_labels(labels + [("le", bound)])} {count}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {snapshot["sum"]}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {snapshot["count"]}')
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families = {}
+
+    def _family(self, name, help_text, kind, labelnames, buckets=None):
+        if name not in self._families:
+            self._families[name] = MetricFamily(name, help_text, kind, labelnames, buckets)
+        return self._families[name]
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._family(name, help_text, 'counter', labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._family(name, help_text, 'histogram', labelnames, buckets)
+
+    def render(self, gauges=None, counters=None):
+        """Prometheus text exposition.
+
+        `gauges` maps name -> (help, value) for point-in-time values; `counters` does the
+        same for running totals kept elsewhere, exposed as `<name>_total` counters.
+        """
+        lines = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        for name, (help_text, value) in (gauges or {}).items():
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}'])
+        for name, (help_text, value) in (counters or {}).items():
+            name = f'{name}_total'
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} counter', f'{name} {value}'])
+        return '\n'.join(lines) + '\n'
+
+METRICS = MetricsRegistry()
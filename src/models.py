@@ -1,39 +1,100 @@
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+import os
+import time
 import joblib
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
 
-from sklearn.svm import SVC
-from sklearn.neural_network import MLPClassifier
+# TF-IDF settings shared by every non-streaming model type
+VECTORIZER_PARAMS = {'max_features': 5000}
+
+# SVC/MLP and the plotting stack are imported where used, so loading this module
+# (e.g. to unpickle or export a logistic model) stays cheap
 
 class SentimentModel:
     def __init__(self, model_type='logistic'):
-        self.vectorizer = TfidfVectorizer(max_features=5000)
+        if model_type == 'sgd_stream':
+            # Stateless hashing features, so chunks can be vectorized without a fitted vocabulary
+            self.vectorizer = HashingVectorizer(n_features=2 ** 20, alternate_sign=False)
+        else:
+            self.vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
         if model_type == 'logistic':
             self.model = LogisticRegression(max_iter=1000)
         elif model_type == 'svm':
+            from sklearn.svm import SVC
             self.model = SVC(probability=True)
         elif model_type == 'mlp':
+            from sklearn.neural_network import MLPClassifier
             self.model = MLPClassifier(hidden_layer_sizes=(100, 50), max_iter=500)
+        elif model_type == 'sgd_stream':
+            # Incremental logistic regression trained with partial_fit
+            self.model = SGDClassifier(loss='log_loss', random_state=42)
         self.model_type = model_type
 
     def train(self, X, y):
         X_vec = self.vectorizer.fit_transform(X)
         X_train, X_test, y_train, y_test = train_test_split(X_vec, y, test_size=0.2, random_state=42)
+        return self.fit_vectorized(X_train, y_train, X_test, y_test)
+
+    def fit_vectorized(self, X_train, y_train, X_test, y_test):
+        """Fit on an already vectorized split; `self.vectorizer` must be the one that produced it."""
+        start = time.perf_counter()
         self.model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+        start = time.perf_counter()
         y_pred = self.model.predict(X_test)
-        
+        predict_seconds = time.perf_counter() - start
+
         metrics = {
             'accuracy': accuracy_score(y_test, y_pred),
             'report': classification_report(y_test, y_pred, output_dict=True, zero_division=0),
-            'confusion_matrix': confusion_matrix(y_test, y_pred)
+            'confusion_matrix': confusion_matrix(y_test, y_pred),
+            'fit_seconds': fit_seconds,
+            'predict_rows_per_second': X_test.shape[0] / predict_seconds if predict_seconds else float('inf'),
         }
         return metrics, y_test, y_pred
 
+    def partial_fit(self, X, y, classes=None):
+        """Update an 'sgd_stream' model with a new labeled batch; `classes` is required on the first call."""
+        X_vec = self.vectorizer.transform(X)
+        self.model.partial_fit(X_vec, y, classes=classes)
+
+    def train_stream(self, chunks, classes, eval_chunks=None, test_size=0.2, random_state=42):
+        """Train an 'sgd_stream' model from an iterable of (texts, labels) chunks in constant memory.
+
+        Wrap load_and_preprocess(..., stream=True) in src.preprocess.labeled_chunks to get such chunks.
+
+        With `eval_chunks` the model is evaluated on that held-out stream after training.
+        Otherwise a `test_size` share of every chunk is held out and scored before the
+        chunk is learned (progressive validation), so those rows are never trained on.
+        """
+        if self.model_type != 'sgd_stream':
+            raise ValueError("train_stream requires model_type='sgd_stream'")
+        labels = np.unique(classes)
+        rng = np.random.RandomState(random_state)
+        cm = np.zeros((len(labels), len(labels)), dtype=np.int64)
+
+        for texts, y in chunks:
+            X_vec = self.vectorizer.transform(texts)
+            y = np.asarray(y)
+            train_mask = np.ones(len(y), dtype=bool)
+            if eval_chunks is None:
+                test_mask = rng.rand(len(y)) < test_size
+                if test_mask.any() and hasattr(self.model, 'classes_'):
+                    cm += confusion_matrix(y[test_mask], self.model.predict(X_vec[test_mask]), labels=labels)
+                train_mask = ~test_mask
+            if train_mask.any():
+                self.model.partial_fit(X_vec[train_mask], y[train_mask], classes=labels)
+
+        if eval_chunks is not None:
+            for texts, y in eval_chunks:
+                y_pred = self.model.predict(self.vectorizer.transform(texts))
+                cm += confusion_matrix(np.asarray(y), y_pred, labels=labels)
+
+        return metrics_from_confusion(cm, labels)
+
     def predict(self, texts):
         X_vec = self.vectorizer.transform(texts)
         return self.model.predict(X_vec)
@@ -42,7 +103,90 @@ class SentimentModel:
         joblib.dump(self.model, model_path)
         joblib.dump(self.vectorizer, vec_path)
 
+    def export_numpy(self, path):
+        """Write vocabulary, idf and weights as plain arrays (.npz) for the NumPy-only runtime."""
+        from src.runtime import export_arrays, save_arrays
+        save_arrays(export_arrays(self.vectorizer, self.model), path)
+
+    def save_artifact(self, name, lang, metadata=None, store_dir=None):
+        """Save as a versioned pipeline in the content-addressed store; returns its manifest."""
+        from src.artifacts import save_pipeline, STORE_DIR
+        return save_pipeline(name, self.vectorizer, self.model, lang, self.model_type,
+                             metadata=metadata, store_dir=store_dir or STORE_DIR)
+
+def _fit_shared(model_type, vectorizer, X_train, y_train, X_test, y_test):
+    # Module-level so joblib can ship it to worker processes
+    model = SentimentModel(model_type=model_type)
+    model.vectorizer = vectorizer
+    metrics, _, y_pred = model.fit_vectorized(X_train, y_train, X_test, y_test)
+    return model, metrics, y_pred
+
+def fit_features(X, vectorizer_params=VECTORIZER_PARAMS):
+    """Fit a TF-IDF vectorizer on cleaned texts; returns (vectorizer, sparse matrix)."""
+    vectorizer = TfidfVectorizer(**vectorizer_params)
+    return vectorizer, vectorizer.fit_transform(X)
+
+def train_models(X, y, model_types, n_jobs=None, test_size=0.2, random_state=42, features=None):
+    """Train several TF-IDF model types on one shared vectorization and split.
+
+    The vectorizer is fitted and the split made once; the models are then fitted
+    concurrently in separate processes (n_jobs=1 trains them one after another).
+    `features` may pass a precomputed (vectorizer, matrix) from `fit_features`, e.g.
+    loaded from the pipeline cache. Returns {model_type: (model, metrics, y_test, y_pred)}.
+    """
+    from joblib import Parallel, delayed
+    vectorizer, X_vec = features or fit_features(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_vec, y, test_size=test_size, random_state=random_state)
+    if n_jobs is None:
+        n_jobs = min(len(model_types), os.cpu_count() or 1)
+    fitted = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_shared)(m_type, vectorizer, X_train, y_train, X_test, y_test) for m_type in model_types)
+    return {m_type: (model, metrics, y_test, y_pred)
+            for m_type, (model, metrics, y_pred) in zip(model_types, fitted)}
+
+def compare_models(results, metric='accuracy'):
+    """Comparison report for `train_models` results; the best model by `metric` is under 'best'.
+
+    `metric` is 'accuracy' or 'macro_f1'; ties go to the model with the higher predict throughput.
+    """
+    models = {}
+    for m_type, (_, metrics, _, _) in results.items():
+        models[m_type] = {
+            'accuracy': float(metrics['accuracy']),
+            'macro_f1': float(metrics['report']['macro avg']['f1-score']),
+            'fit_seconds': metrics['fit_seconds'],
+            'predict_rows_per_second': metrics['predict_rows_per_second'],
+        }
+    best = max(models, key=lambda m: (models[m][metric], models[m]['predict_rows_per_second']))
+    return {'selected_by': metric, 'best': best, 'models': models}
+
+def metrics_from_confusion(cm, labels):
+    """Build the `train` metrics dict (classification_report layout) from a confusion matrix."""
+    tp = np.diag(cm).astype(float)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    zeros = np.zeros(len(labels))
+    precision = np.divide(tp, predicted, out=zeros.copy(), where=predicted > 0)
+    recall = np.divide(tp, support, out=zeros.copy(), where=support > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=zeros.copy(), where=(precision + recall) > 0)
+    total = int(support.sum())
+    accuracy = float(tp.sum() / total) if total else 0.0
+
+    report = {}
+    for i, label in enumerate(labels):
+        report[str(label)] = {'precision': float(precision[i]), 'recall': float(recall[i]),
+                              'f1-score': float(f1[i]), 'support': int(support[i])}
+    report['accuracy'] = accuracy
+    weights = support / total if total else zeros
+    report['macro avg'] = {'precision': float(precision.mean()), 'recall': float(recall.mean()),
+                           'f1-score': float(f1.mean()), 'support': total}
+    report['weighted avg'] = {'precision': float(precision @ weights), 'recall': float(recall @ weights),
+                              'f1-score': float(f1 @ weights), 'support': total}
+    return {'accuracy': accuracy, 'report': report, 'confusion_matrix': cm}
+
 def plot_confusion_matrix(cm, labels, output_path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     plt.figure(figsize=(10, 7))
     sns.heatmap(cm, annot=True, fmt='d', xticklabels=labels, yticklabels=labels, cmap='Blues')
     plt.xlabel('Predicted')
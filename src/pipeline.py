@@ -0,0 +1,163 @@
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from src.pipeline_cache import file_digest, make_key
+
+# Stage outputs and run state of the in-process pipeline runner
+RUN_DIR = os.environ.get('PIPELINE_RUN_DIR', 'cache/runs')
+
+def frame_fingerprint(df):
+    """Content hash of a DataFrame (values, index and column names)."""
+    import pandas as pd
+    sha = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    sha.update(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+    return sha.hexdigest()
+
+class PeakMemory:
+    """Samples this process's RSS on a background thread; `peak` is the highest value seen (bytes)."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self, process):
+        while True:
+            self.peak = max(self.peak or 0, process.memory_info().rss)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        try:
+            import psutil
+        except ImportError:
+            return self
+        self._thread = threading.Thread(target=self._sample, args=(psutil.Process(),), daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+class Stage:
+    """One pipeline step: `func(*outputs of deps, **params)` returns a DataFrame, or None for side effects.
+
+    The stage key covers the source of `func`'s module plus any `sources` files, its params,
+    the contents of `files` it reads directly and the output fingerprints of its deps.
+    Side-effect stages list the paths they write in `outputs`; deleting one reruns the stage.
+    A func may modify its input DataFrame in place only if no other stage reads it.
+    """
+
+    def __init__(self, name, func, deps=(), params=None, files=(), sources=(), outputs=()):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.params = params or {}
+        self.files = list(files)
+        self.sources = [inspect.getsourcefile(func)] + list(sources)
+        self.outputs = list(outputs)
+
+    def key(self, dep_fingerprints):
+        return make_key(self.name, [file_digest(p) for p in self.sources], self.params,
+                        [file_digest(p) for p in self.files], dep_fingerprints)
+
+class Pipeline:
+    """Runs stages in dependency order in one process, passing DataFrames in memory.
+
+    A stage whose key matches the last run is skipped; its output is reloaded from the
+    run directory only if a downstream stage has to run. Because deps are keyed by the
+    fingerprint of their output, a change that leaves a stage's output identical does
+    not rerun anything downstream.
+    """
+
+    def __init__(self, stages, run_dir=RUN_DIR):
+        self.stages = {s.name: s for s in stages}
+        self.run_dir = run_dir
+        self.state_path = os.path.join(run_dir, 'state.json')
+
+    def _order(self):
+        order, visiting = [], set()
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+                visit(dep)
+            order.append(name)
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        tmp_path = f'{self.state_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def run(self, force=()):
+        """Run every stage that changed (or is named in `force`); returns one report row per stage."""
+        from src.tables import read_table, write_table
+        os.makedirs(self.run_dir, exist_ok=True)
+        state = self._load_state()
+        fingerprints, outputs, report = {}, {}, []
+
+        def output(name):
+            # Skipped stages are only read back from disk when something downstream needs them
+            if name not in outputs:
+                outputs[name] = read_table(state[name]['path'])
+            return outputs[name]
+
+        for name in self._order():
+            stage = self.stages[name]
+            key = stage.key([fingerprints[d] for d in stage.deps])
+            previous = state.get(name)
+            produced = [previous['path']] if previous and previous['path'] else []
+            if (name not in force and previous and previous['key'] == key
+                    and all(os.path.exists(p) for p in produced + stage.outputs)):
+                fingerprints[name] = previous['fingerprint']
+                report.append({'stage': name, 'status': 'skipped', 'seconds': 0.0, 'peak_rss_mb': None})
+                continue
+
+            inputs = [output(d) for d in stage.deps]
+            print(f"[{name}] running...")
+            start = time.perf_counter()
+            with PeakMemory() as memory:
+                result = stage.func(*inputs, **stage.params)
+            seconds = time.perf_counter() - start
+
+            path = None
+            if result is not None:
+                path = os.path.join(self.run_dir, f'{name}.parquet')
+                write_table(result, path, export_csv=False)
+                outputs[name] = result
+                fingerprints[name] = frame_fingerprint(result)
+            else:
+                fingerprints[name] = key
+            state[name] = {'key': key, 'fingerprint': fingerprints[name], 'path': path}
+            # Saved after every stage, so a failure later on keeps the work already done
+            self._save_state(state)
+            peak = memory.peak / 2 ** 20 if memory.peak else None
+            report.append({'stage': name, 'status': 'ran', 'seconds': seconds, 'peak_rss_mb': peak})
+        return report
+
+def print_report(report):
+    print(f"{'stage':<14} {'status':<8} {'seconds':>9} {'peak RSS MB':>12}")
+    for row in report:
+        peak = f"{row['peak_rss_mb']:.0f}" if row['peak_rss_mb'] is not None else '-'
+        print(f"{row['stage']:<14} {row['status']:<8} {row['seconds']:>9.2f} {peak:>12}")
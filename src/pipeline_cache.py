@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import shutil
+
+# Training-pipeline cache: cleaned text and fitted features are stored under
+# <cache_dir>/<key>/, where the key hashes everything the entry was derived from
+CACHE_DIR = os.environ.get('PIPELINE_CACHE_DIR', 'cache/pipeline')
+PREPROCESS_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preprocess.py')
+
+def file_digest(path, block_size=1 << 20):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def make_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def preprocess_fingerprint(lang):
+    """Hash of the cleaning code and stop word list, so edits to either invalidate cleaned text."""
+    from src.resources import load_stopwords
+    stop_words = sorted(load_stopwords('english' if lang == 'en' else 'arabic'))
+    return make_key(file_digest(PREPROCESS_SOURCE), lang, stop_words)
+
+class PipelineCache:
+    """On-disk cache for the cleaned-text column and the fitted vectorizer + sparse matrix."""
+
+    def __init__(self, cache_dir=CACHE_DIR, enabled=True):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _publish(self, key, write):
+        # Write into a temporary directory and rename it, so a crash never leaves a half entry
+        path = self._entry(key)
+        tmp_path = f'{path}.tmp{os.getpid()}'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        write(tmp_path)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            # Another run published the same entry first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def cleaned_key(self, filepath, text_col, lang):
+        return make_key('cleaned', file_digest(filepath), text_col, preprocess_fingerprint(lang))
+
+    def cleaned_text(self, key, compute):
+        """Return the cached cleaned-text list for `key`, or store and return `compute()`."""
+        path = os.path.join(self._entry(key), 'cleaned.json')
+        if self.enabled and os.path.exists(path):
+            self.hits += 1
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        self.misses += 1
+        cleaned = [str(t) for t in compute()]
+        if self.enabled:
+            def write(tmp_path):
+                with open(os.path.join(tmp_path, 'cleaned.json'), 'w', encoding='utf-8') as f:
+                    json.dump(cleaned, f, ensure_ascii=False)
+            self._publish(key, write)
+        return cleaned
+
+    def features_key(self, cleaned_key, vectorizer_params):
+        import sklearn
+        return make_key('features', cleaned_key, vectorizer_params, sklearn.__version__)
+
+    def features(self, key, compute):
+        """Return the cached (fitted vectorizer, sparse matrix) for `key`, or store and return `compute()`."""
+        import joblib
+        import scipy.sparse as sp
+        entry = self._entry(key)
+        if self.enabled and os.path.exists(os.path.join(entry, 'matrix.npz')):
+            self.hits += 1
+            return joblib.load(os.path.join(entry, 'vectorizer.joblib')), sp.load_npz(os.path.join(entry, 'matrix.npz'))
+        self.misses += 1
+        vectorizer, matrix = compute()
+        if self.enabled:
+            def write(tmp_path):
+                joblib.dump(vectorizer, os.path.join(tmp_path, 'vectorizer.joblib'))
+                sp.save_npz(os.path.join(tmp_path, 'matrix.npz'), matrix.tocsr())
+            self._publish(key, write)
+        return vectorizer, matrix
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'enabled': self.enabled, 'cache_dir': self.cache_dir}
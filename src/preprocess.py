@@ -1,74 +1,165 @@
+import json
+import os
 import re
 import string
-import pandas as pd
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from src.resources import load_stopwords
 
-# Download NLTK data
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# pandas and NLTK are imported lazily: single-text inference needs neither pandas
+# nor (once the stem cache is warm) the NLTK stemmer
+
+# Patterns are compiled once at import and shared by the per-text and batch paths
+EN_STRIP_RE = re.compile(r'@\w+|http\S+|[^\w\s]')
+DIGITS_RE = re.compile(r'\d+')
+AR_NON_ARABIC_RE = re.compile(r'[^\u0600-\u06ff\s]')
+REPEAT_RE = re.compile(r'(.)\1+')
+
+# Diacritic removal and letter normalization as a single str.translate table
+AR_TRANSLATION = str.maketrans({
+    '\u0651': None,  # Tashdid
+    '\u064e': None,  # Fatha
+    '\u064b': None,  # Tanwin Fath
+    '\u064f': None,  # Damma
+    '\u064c': None,  # Tanwin Damm
+    '\u0650': None,  # Kasra
+    '\u064d': None,  # Tanwin Kasr
+    '\u0652': None,  # Sukun
+    '\u0640': None,  # Tatwil/Kashida
+    'إ': 'ا',
+    'أ': 'ا',
+    'آ': 'ا',
+    'ى': 'ي',
+    'ؤ': 'ء',
+    'ئ': 'ء',
+    'ة': 'ه',
+    'گ': 'ك',
+})
+
+class StemCache:
+    """Bounded token -> stem memo shared by every TextPreprocessor in the process."""
+
+    def __init__(self, maxsize=100000, stemmer=None):
+        self.maxsize = maxsize
+        self._stemmer = stemmer
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        self._lock = threading.Lock()
+
+    @property
+    def stemmer(self):
+        if self._stemmer is None:
+            from nltk.stem import PorterStemmer
+            self._stemmer = PorterStemmer()
+        return self._stemmer
+
+    def stem(self, token):
+        try:
+            stem = self._data[token]
+        except KeyError:
+            return self._miss(token)
+        self.hits += 1
+        return stem
+
+    def _miss(self, token):
+        with self._lock:
+            self.misses += 1
+            stem = self.stemmer.stem(token)
+            if len(self._data) >= self.maxsize:
+                # Evict the oldest entry; frequent tokens come straight back on their next miss
+                self._data.pop(next(iter(self._data)), None)
+            self._data[token] = stem
+        return stem
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self, path):
+        with self._lock:
+            data = dict(self._data)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def load(self, path):
+        """Preload entries saved by `save` so a new worker starts warm; returns the number loaded."""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return self.update(data)
+
+    def update(self, entries):
+        """Add token -> stem entries until the cache is full; returns the number added."""
+        added = 0
+        with self._lock:
+            for token, stem in entries.items():
+                if len(self._data) >= self.maxsize:
+                    break
+                self._data[token] = stem
+                added += 1
+        return added
+
+STEM_CACHE = StemCache()
 
 class TextPreprocessor:
-    def __init__(self, lang='en'):
+    def __init__(self, lang='en', stem_cache=None):
         self.lang = lang
         if lang == 'en':
-            self.stop_words = set(stopwords.words('english'))
-            self.stemmer = PorterStemmer()
+            self.stop_words = load_stopwords('english')
+            self.stem_cache = stem_cache or STEM_CACHE
         elif lang == 'ar':
             # Basic Arabic stop words (can be expanded)
-            self.stop_words = set(stopwords.words('arabic'))
+            self.stop_words = load_stopwords('arabic')
+
+    @property
+    def stemmer(self):
+        return self.stem_cache.stemmer
     
     def clean_english(self, text):
         if not isinstance(text, str):
             return ""
         # Remove mentions, urls, and special characters
-        text = re.sub(r'@\w+|http\S+|[^\w\s]', '', text).lower()
+        text = EN_STRIP_RE.sub('', text).lower()
         # Remove numbers
-        text = re.sub(r'\d+', '', text)
+        text = DIGITS_RE.sub('', text)
+        return self._finish_english(text)
+
+    def _finish_english(self, text):
         # Tokenize and remove stopwords + stemming
-        words = text.split()
-        cleaned_words = [self.stemmer.stem(w) for w in words if w not in self.stop_words]
-        return " ".join(cleaned_words)
+        stem = self.stem_cache.stem
+        stop_words = self.stop_words
+        return " ".join([stem(w) for w in text.split() if w not in stop_words])
 
     def clean_arabic(self, text):
         if not isinstance(text, str):
             return ""
-        # Remove diacritics
-        arabic_diacritics = re.compile("""
-                             ّ    | # Tashdid
-                             َ    | # Fatha
-                             ً    | # Tanwin Fath
-                             ُ    | # Damma
-                             ٌ    | # Tanwin Damm
-                             ِ    | # Kasra
-                             ٍ    | # Tanwin Kasr
-                             ْ    | # Sukun
-                             ـ    | # Tatwil/Kashida
-                         """, re.VERBOSE)
-        text = re.sub(arabic_diacritics, '', text)
-        
-        # Normalize
-        text = re.sub("[إأآا]", "ا", text)
-        text = re.sub("ى", "ي", text)
-        text = re.sub("ؤ", "ء", text)
-        text = re.sub("ئ", "ء", text)
-        text = re.sub("ة", "ه", text)
-        text = re.sub("گ", "ك", text)
+        # Remove diacritics and normalize letter variants
+        text = text.translate(AR_TRANSLATION)
         
         # Remove punctuation, numbers, and latin chars
-        text = re.sub(r'[^\u0600-\u06ff\s]', '', text)
-        text = re.sub(r'\d+', '', text)
+        text = AR_NON_ARABIC_RE.sub('', text)
+        text = DIGITS_RE.sub('', text)
         
         # Remove repeated characters (e.g., هههههه -> هه)
-        text = re.sub(r'(.)\1+', r'\1\1', text)
-        
+        text = REPEAT_RE.sub(r'\1\1', text)
+        return self._finish_arabic(text)
+
+    def _finish_arabic(self, text):
         # Tokenize and remove stopwords
-        words = text.split()
-        cleaned_words = [w for w in words if w not in self.stop_words]
-        return " ".join(cleaned_words)
+        stop_words = self.stop_words
+        return " ".join([w for w in text.split() if w not in stop_words])
 
     def preprocess(self, text):
         if self.lang == 'en':
@@ -77,8 +168,121 @@ class TextPreprocessor:
             return self.clean_arabic(text)
         return text
 
-def load_and_preprocess(filepath, text_col, target_col, lang='en'):
-    df = pd.read_csv(filepath)
-    preprocessor = TextPreprocessor(lang=lang)
-    df['cleaned_text'] = df[text_col].apply(preprocessor.preprocess)
+    def preprocess_batch(self, series):
+        """Column-wise equivalent of `series.apply(self.preprocess)`."""
+        import pandas as pd
+        series = pd.Series(series)
+        if self.lang not in ('en', 'ar'):
+            return series.copy()
+
+        # Non-string cells (NaN, numbers) clean to "" just like `preprocess`
+        is_str = series.map(lambda t: isinstance(t, str)).astype(bool)
+        texts = series.where(is_str, "").astype(object)
+
+        if self.lang == 'en':
+            texts = texts.str.replace(EN_STRIP_RE, '', regex=True).str.lower()
+            texts = texts.str.replace(DIGITS_RE, '', regex=True)
+            finish = self._finish_english
+        else:
+            texts = texts.str.translate(AR_TRANSLATION)
+            texts = texts.str.replace(AR_NON_ARABIC_RE, '', regex=True)
+            texts = texts.str.replace(DIGITS_RE, '', regex=True)
+            texts = texts.str.replace(REPEAT_RE, r'\1\1', regex=True)
+            finish = self._finish_arabic
+
+        return pd.Series([finish(t) for t in texts], index=series.index, name=series.name, dtype=object)
+
+# Per-process state of the parallel preprocessing workers
+_worker_preprocessor = None
+_worker_sent_stems = set()
+
+def _init_worker(lang):
+    global _worker_preprocessor
+    _worker_preprocessor = TextPreprocessor(lang=lang)
+
+def _preprocess_chunk(texts):
+    import pandas as pd
+    cleaned = _worker_preprocessor.preprocess_batch(pd.Series(texts, dtype=object)).tolist()
+    # Ship newly learned stems back so the parent's cache ends up as warm as a serial run
+    new_stems = {}
+    if _worker_preprocessor.lang == 'en':
+        new_stems = {k: v for k, v in list(STEM_CACHE._data.items()) if k not in _worker_sent_stems}
+        _worker_sent_stems.update(new_stems)
+    return cleaned, new_stems
+
+def parallel_preprocess(series, lang='en', n_jobs=None, chunksize=10000):
+    """Preprocess `series` in chunks across a process pool, keeping the input order.
+
+    n_jobs=1 (or a series no longer than one chunk) runs serially in this process,
+    which is also the switch to use when debugging. n_jobs=None uses every core.
+    """
+    import pandas as pd
+    series = pd.Series(series)
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs <= 1 or len(series) <= chunksize:
+        return TextPreprocessor(lang=lang).preprocess_batch(series)
+
+    with _make_pool(lang, n_jobs) as pool:
+        return _preprocess_in_pool(pool, series, chunksize)
+
+def _make_pool(lang, n_jobs):
+    return ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(lang,))
+
+def _preprocess_in_pool(pool, series, chunksize):
+    import pandas as pd
+    values = series.tolist()
+    chunks = [values[i:i + chunksize] for i in range(0, len(values), chunksize)]
+    cleaned = []
+    # map() yields results in submission order, so chunks reassemble in place
+    for chunk_cleaned, new_stems in pool.map(_preprocess_chunk, chunks):
+        cleaned.extend(chunk_cleaned)
+        if new_stems:
+            STEM_CACHE.update(new_stems)
+    return pd.Series(cleaned, index=series.index, name=series.name, dtype=object)
+
+def iter_preprocessed_chunks(filepath, text_col, lang='en', chunksize=50000, usecols=None,
+                             encoding='utf-8', n_jobs=1):
+    """Read `filepath` in chunks of `chunksize` rows and yield each one with a `cleaned_text` column.
+
+    Only `usecols` are kept, so peak memory is bounded by the chunk size rather than the file size.
+    With n_jobs > 1 every chunk is split across one process pool kept alive for the whole stream.
+    """
+    import pandas as pd
+    reader = pd.read_csv(filepath, usecols=usecols, chunksize=chunksize, encoding=encoding)
+    if n_jobs <= 1:
+        preprocessor = TextPreprocessor(lang=lang)
+        for chunk in reader:
+            chunk['cleaned_text'] = preprocessor.preprocess_batch(chunk[text_col])
+            yield chunk
+        return
+
+    sub_chunksize = max(1, -(-chunksize // n_jobs))
+    with _make_pool(lang, n_jobs) as pool:
+        for chunk in reader:
+            chunk['cleaned_text'] = _preprocess_in_pool(pool, chunk[text_col], sub_chunksize)
+            yield chunk
+
+def load_and_preprocess(filepath, text_col, target_col, lang='en', n_jobs=1, chunksize=10000,
+                        stream=False, usecols=None):
+    """Load and clean a CSV. With stream=True, return a generator of cleaned chunks of `chunksize` rows."""
+    if stream:
+        if usecols is None:
+            usecols = [text_col, target_col]
+        return iter_preprocessed_chunks(filepath, text_col, lang=lang, chunksize=chunksize,
+                                        usecols=usecols, n_jobs=n_jobs)
+    import pandas as pd
+    df = pd.read_csv(filepath, usecols=usecols)
+    df['cleaned_text'] = parallel_preprocess(df[text_col], lang=lang, n_jobs=n_jobs, chunksize=chunksize)
     return df
+
+def labeled_chunks(chunks, target_col, text_col='cleaned_text'):
+    """Turn cleaned DataFrame chunks into the (texts, labels) pairs SentimentModel.train_stream expects.
+
+    Rows without a label are dropped, e.g.
+    model.train_stream(labeled_chunks(load_and_preprocess(path, 'text', 'label', stream=True), 'label'), classes)
+    """
+    for chunk in chunks:
+        chunk = chunk.dropna(subset=[target_col])
+        if len(chunk):
+            yield chunk[text_col].fillna('').tolist(), chunk[target_col].to_numpy()
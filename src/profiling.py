@@ -0,0 +1,130 @@
+import cProfile
+import os
+import random
+import threading
+from collections import Counter
+
+def _function_label(function):
+    # pstats key: (filename, line, name); built-ins have filename '~'
+    filename, _, name = function
+    return name if filename == '~' else f"{os.path.basename(filename)}:{name}"
+
+class CallProfiler:
+    """Deterministic profile of the code run inside the block, via cProfile.
+
+    Every call is recorded, so a 1 ms request is profiled as fully as a long one.
+    `samples` converts the result to collapsed stacks ("outer;inner;leaf" -> count,
+    the input format of flamegraph.pl and speedscope) weighted in microseconds.
+    cProfile only records caller -> callee edges, so the time of a function called
+    from several places is split between its callers in proportion to the time each
+    call edge took.
+    """
+
+    max_depth = 64
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self.stats = {}
+
+    def __enter__(self):
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profile.disable()
+        self._profile.create_stats()
+        self.stats = self._profile.stats
+        return False
+
+    @property
+    def samples(self):
+        exit_code = CallProfiler.__exit__.__code__
+        own = {(exit_code.co_filename, exit_code.co_firstlineno, exit_code.co_name),
+               ('~', 0, "<method 'disable' of '_lsprof.Profiler' objects>")}
+        stats = {f: s for f, s in self.stats.items() if f not in own}
+        callees = {}
+        for function, (_, _, _, _, callers) in stats.items():
+            for caller, edge in callers.items():
+                if caller in stats:
+                    callees.setdefault(caller, []).append((function, edge[3]))
+        samples = Counter()
+
+        def visit(function, seconds, path):
+            _, _, self_time, total_time, _ = stats[function]
+            path = path + (function,)
+            scale = seconds / total_time if total_time else 0.0
+            weight = int(round(self_time * scale * 1e6))
+            if weight:
+                samples[';'.join(_function_label(f) for f in path)] += weight
+            if len(path) < self.max_depth:
+                for callee, edge_time in callees.get(function, ()):
+                    # Recursive edges are already inside the caller's inclusive time
+                    if callee not in path:
+                        visit(callee, edge_time * scale, path)
+
+        for function, (_, _, _, total_time, callers) in stats.items():
+            # Time not accounted for by profiled callers was called straight from the block
+            outside = total_time - sum(edge[3] for caller, edge in callers.items() if caller in stats)
+            if outside > 0:
+                visit(function, outside, ())
+        return samples
+
+class ProfileAggregator:
+    """Decides which scoring calls to profile and merges their collapsed stacks.
+
+    Counts are CallProfiler microseconds.
+    """
+
+    def __init__(self, rate=0.0):
+        self.rate = rate
+        self.profiled_calls = 0
+        self.samples = Counter()
+        self._lock = threading.Lock()
+
+    def should_sample(self):
+        # A single float comparison when disabled
+        return self.rate > 0 and random.random() < self.rate
+
+    def add(self, samples, tag=None):
+        prefix = f"{tag};" if tag else ""
+        with self._lock:
+            self.profiled_calls += 1
+            for stack, count in samples.items():
+                self.samples[prefix + stack] += count
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.profiled_calls = 0
+
+    def collapsed(self):
+        """Flamegraph-compatible collapsed stacks, one "stack count" line each."""
+        with self._lock:
+            return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def report(self, top=30):
+        """Plain-text hot-function table: self and inclusive share of the total count."""
+        with self._lock:
+            samples = dict(self.samples)
+            calls = self.profiled_calls
+        total = sum(samples.values())
+        self_counts = Counter()
+        inclusive_counts = Counter()
+        for stack, count in samples.items():
+            frames = stack.split(';')
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                inclusive_counts[frame] += count
+
+        lines = [f"profiled calls: {calls}, total: {total}", f"{'self %':>8} {'total %':>8}  function"]
+        for frame, count in self_counts.most_common(top):
+            lines.append(f"{100 * count / total:>8.1f} {100 * inclusive_counts[frame] / total:>8.1f}  {frame}")
+        return '\n'.join(lines) + '\n'
+
+    def stats(self):
+        return {
+            'rate': self.rate,
+            'profiled_calls': self.profiled_calls,
+            'samples': sum(self.samples.values()),
+            'distinct_stacks': len(self.samples),
+        }
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from src.preprocess import STEM_CACHE
+from src.aspect import AspectExtractor
+from src.artifacts import load_predictor
+
+# Dummy inputs used to warm up every component once after loading
+WARMUP_TEXTS = {
+    'en': "The flight was delayed and the staff were rude.",
+    'ar': "الرحلة كانت جميلة والخدمة ممتازة",
+}
+
+# Stem cache persisted by the English training pipeline
+STEM_CACHE_PATH = 'models/en_stem_cache.json'
+
+class ComponentRegistry:
+    """Process-wide, thread-safe holder of the per-language inference components."""
+
+    def __init__(self, model_dir='models', model_type='logistic', langs=('en', 'ar'), backend=None):
+        self.model_dir = model_dir
+        self.model_type = model_type
+        # 'sklearn' (default) or 'numpy' for the scikit-learn-free runtime
+        self.backend = backend or os.environ.get('SENTIMENT_BACKEND', 'sklearn')
+        self.langs = list(langs)
+        self.preprocessors = {}
+        self.aspect_extractors = {}
+        self.predictors = {}
+        self.vectorizers = {}
+        self.models = {}
+        self.versions = {}
+        self.status = {lang: 'not_loaded' for lang in self.langs}
+        self.errors = {}
+        self._reload_listeners = []
+        self._lock = threading.RLock()
+
+    def add_reload_listener(self, callback):
+        """Call `callback(lang)` whenever a language's components are (re)loaded."""
+        self._reload_listeners.append(callback)
+
+    def load(self, lang, force=False):
+        with self._lock:
+            if self.status.get(lang) == 'ready' and not force:
+                return True
+            self.status[lang] = 'loading'
+            try:
+                if lang == 'en' and os.path.exists(STEM_CACHE_PATH):
+                    STEM_CACHE.load(STEM_CACHE_PATH)
+                predictor = load_predictor(lang, self.model_type, legacy_dir=self.model_dir, backend=self.backend)
+                aspect_extractor = AspectExtractor(language=lang)
+
+                # Warm up with a dummy inference so the first request pays no lazy-init cost
+                text = WARMUP_TEXTS.get(lang, "warmup")
+                predictor.predict_with_confidence([text])
+                aspect_extractor.detect_aspect(text)
+            except Exception as e:
+                self.status[lang] = 'failed'
+                self.errors[lang] = str(e)
+                return False
+
+            self.predictors[lang] = predictor
+            self.preprocessors[lang] = predictor.preprocessor
+            self.aspect_extractors[lang] = aspect_extractor
+            self.vectorizers[lang] = predictor.vectorizer
+            self.models[lang] = predictor.model
+            self.versions[lang] = predictor.version
+            self.errors.pop(lang, None)
+            self.status[lang] = 'ready'
+            for callback in self._reload_listeners:
+                callback(lang)
+            return True
+
+    def load_all(self, force=False):
+        return {lang: self.load(lang, force=force) for lang in self.langs}
+
+    def is_ready(self, lang=None):
+        if lang is None:
+            return all(self.status[l] == 'ready' for l in self.langs)
+        return self.status.get(lang) == 'ready'
+
+    def readiness(self):
+        return {
+            'ready': self.is_ready(),
+            'backend': self.backend,
+            'langs': dict(self.status),
+            'versions': dict(self.versions),
+            'errors': dict(self.errors),
+            'stem_cache': STEM_CACHE.stats(),
+        }
+
+    def score(self, lang, texts, timings=None):
+        """Score a group of same-language texts; returns (sentiment, aspect, confidence) tuples.
+
+        If `timings` is a dict, per-stage seconds are added to it.
+        """
+        # One sparse transform and one predict call for the whole group
+        sentiments, confidences = self.predictors[lang].predict_with_confidence(texts, timings=timings)
+        start = time.perf_counter()
+        aspects, _ = self.aspect_extractors[lang].detect_aspects_batch(texts)
+        if timings is not None:
+            timings['aspect'] = timings.get('aspect', 0.0) + time.perf_counter() - start
+        return list(zip(sentiments, aspects, confidences))
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ComponentRegistry()
+        return _registry
@@ -0,0 +1,43 @@
+import functools
+import os
+import sys
+
+# Bundled NLTK resource snapshot, so workers start without network access or an
+# nltk_data lookup. Files use NLTK's own layout: resources/stopwords/<language>.
+RESOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+STOPWORD_LANGUAGES = ['english', 'arabic']
+
+def _nltk_stopwords(language):
+    import nltk
+    from nltk.corpus import stopwords
+    try:
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        nltk.download('stopwords')
+    return stopwords.words(language)
+
+@functools.lru_cache(maxsize=None)
+def load_stopwords(language):
+    """Stop word set for an NLTK language name, from the bundled snapshot when present."""
+    path = os.path.join(RESOURCE_DIR, 'stopwords', language)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return frozenset(line.strip() for line in f if line.strip())
+    # No snapshot yet: fall back to the NLTK corpus (downloaded on first use)
+    return frozenset(_nltk_stopwords(language))
+
+def snapshot_stopwords(languages=STOPWORD_LANGUAGES):
+    """Copy the installed NLTK stop word lists into the bundled snapshot."""
+    target_dir = os.path.join(RESOURCE_DIR, 'stopwords')
+    os.makedirs(target_dir, exist_ok=True)
+    for language in languages:
+        with open(os.path.join(target_dir, language), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(_nltk_stopwords(language)) + '\n')
+    return target_dir
+
+if __name__ == "__main__":
+    # python -m src.resources snapshot
+    if sys.argv[1:] == ['snapshot']:
+        print(f"Stop words written to {snapshot_stopwords()}")
+    else:
+        print("usage: python -m src.resources snapshot")
@@ -0,0 +1,199 @@
+import hashlib
+import io
+import json
+import re
+import numpy as np
+
+# NumPy-only inference for TF-IDF + LogisticRegression / MLPClassifier pipelines.
+# Exported arrays are plain ndarrays, so serving needs neither scikit-learn nor pickle.
+
+ACTIVATIONS = {
+    'identity': lambda x: x,
+    'logistic': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    'tanh': np.tanh,
+    'relu': lambda x: np.maximum(x, 0),
+}
+
+def _softmax(x):
+    x = np.exp(x - x.max(axis=1)[:, np.newaxis])
+    return x / x.sum(axis=1)[:, np.newaxis]
+
+def export_arrays(vectorizer, model):
+    """Flatten a fitted TfidfVectorizer + classifier into a dict of arrays; raises ValueError if unsupported."""
+    if not hasattr(vectorizer, 'vocabulary_') or not hasattr(vectorizer, 'idf_'):
+        raise ValueError(f"{type(vectorizer).__name__} is not a fitted TfidfVectorizer")
+    if (vectorizer.analyzer != 'word' or tuple(vectorizer.ngram_range) != (1, 1)
+            or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None
+            or vectorizer.strip_accents is not None):
+        raise ValueError("Only word unigram TfidfVectorizers with the default tokenizer can be exported")
+
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    config = {
+        'lowercase': bool(vectorizer.lowercase),
+        'token_pattern': vectorizer.token_pattern,
+        'binary': bool(vectorizer.binary),
+        'sublinear_tf': bool(vectorizer.sublinear_tf),
+        'norm': vectorizer.norm,
+    }
+    arrays = {
+        'terms': np.array(terms, dtype=str),
+        'idf': np.asarray(vectorizer.idf_, dtype=np.float64),
+        'classes': np.asarray(model.classes_).astype(str),
+    }
+
+    name = type(model).__name__
+    if name == 'LogisticRegression':
+        # Mirrors LogisticRegression.predict_proba: one-vs-rest sigmoid or multinomial softmax
+        multi_class = getattr(model, 'multi_class', 'auto')
+        ovr = multi_class in ('ovr', 'warn') or (
+            multi_class in ('auto', 'deprecated') and (len(model.classes_) <= 2 or model.solver == 'liblinear'))
+        config.update(kind='linear', ovr=ovr)
+        arrays['coef'] = np.asarray(model.coef_, dtype=np.float64)
+        arrays['intercept'] = np.asarray(model.intercept_, dtype=np.float64)
+    elif name == 'MLPClassifier':
+        config.update(kind='mlp', activation=model.activation, out_activation=model.out_activation_,
+                      n_layers=len(model.coefs_))
+        for i, (W, b) in enumerate(zip(model.coefs_, model.intercepts_)):
+            arrays[f'W{i}'] = np.asarray(W, dtype=np.float64)
+            arrays[f'b{i}'] = np.asarray(b, dtype=np.float64)
+    else:
+        raise ValueError(f"No NumPy runtime for {name}")
+
+    arrays['config'] = np.array(json.dumps(config))
+    return arrays
+
+def arrays_digest(arrays):
+    # Hash array contents rather than .npz bytes, which embed zip timestamps
+    digest = hashlib.sha256()
+    for key in sorted(arrays):
+        value = arrays[key]
+        digest.update(f'{key}:{value.dtype.str}:{value.shape}'.encode())
+        digest.update(value.tobytes())
+    return digest.hexdigest()
+
+def save_arrays(arrays, path):
+    np.savez(path, **arrays)
+
+def arrays_to_bytes(arrays):
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+class NumpyModel:
+    """TF-IDF, linear scorer / MLP forward pass and softmax computed directly with NumPy."""
+
+    def __init__(self, arrays):
+        config = json.loads(str(arrays['config']))
+        self.config = config
+        self.lowercase = config['lowercase']
+        self.token_re = re.compile(config['token_pattern'])
+        self.vocabulary = {term: i for i, term in enumerate(arrays['terms'].tolist())}
+        self.idf = arrays['idf']
+        self.classes_ = arrays['classes']
+        self.kind = config['kind']
+        if self.kind == 'linear':
+            # Stored transposed so each document gathers contiguous rows
+            self.coef_t = np.ascontiguousarray(arrays['coef'].T)
+            self.intercept = arrays['intercept']
+        else:
+            self.weights = [arrays[f'W{i}'] for i in range(config['n_layers'])]
+            self.biases = [arrays[f'b{i}'] for i in range(config['n_layers'])]
+            self.activation = ACTIVATIONS[config['activation']]
+
+    @classmethod
+    def load(cls, path_or_file):
+        with np.load(path_or_file, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def _features(self, doc):
+        # Sparse TF-IDF row as (sorted column indices, values), like TfidfVectorizer.transform
+        if self.lowercase:
+            doc = doc.lower()
+        counts = {}
+        vocabulary = self.vocabulary
+        for token in self.token_re.findall(doc):
+            j = vocabulary.get(token)
+            if j is not None:
+                counts[j] = counts.get(j, 0) + 1
+        idx = np.array(sorted(counts), dtype=np.intp)
+        values = np.array([counts[j] for j in idx], dtype=np.float64)
+        if self.config['binary']:
+            values[:] = 1.0
+        if self.config['sublinear_tf']:
+            values = np.log(values) + 1
+        values *= self.idf[idx]
+        norm = self.config['norm']
+        if norm == 'l2':
+            scale = np.sqrt(np.dot(values, values))
+        elif norm == 'l1':
+            scale = np.abs(values).sum()
+        else:
+            scale = 0.0
+        if scale > 0:
+            values /= scale
+        return idx, values
+
+    def _first_layer(self, texts, W, n_out):
+        # X @ W with X sparse: gather only the rows of W for each document's non-zero terms
+        out = np.zeros((len(texts), n_out))
+        for row, doc in enumerate(texts):
+            idx, values = self._features(doc)
+            if len(idx):
+                out[row] = values @ W[idx]
+        return out
+
+    def decision_function(self, texts):
+        scores = self._first_layer(texts, self.coef_t, self.coef_t.shape[1]) + self.intercept
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def _linear_proba(self, scores):
+        if self.config['ovr']:
+            proba = ACTIVATIONS['logistic'](scores)
+            if proba.ndim == 1:
+                return np.vstack([1 - proba, proba]).T
+            return proba / proba.sum(axis=1)[:, np.newaxis]
+        if scores.ndim == 1:
+            scores = np.c_[-scores, scores]
+        return _softmax(scores)
+
+    def _forward(self, texts):
+        h = self._first_layer(texts, self.weights[0], self.weights[0].shape[1]) + self.biases[0]
+        for W, b in zip(self.weights[1:], self.biases[1:]):
+            h = self.activation(h)
+            h = h @ W + b
+        out_activation = self.config['out_activation']
+        if out_activation == 'softmax':
+            return _softmax(h)
+        return ACTIVATIONS[out_activation](h)
+
+    def _mlp_proba(self, texts):
+        proba = self._forward(texts)
+        if proba.shape[1] == 1:
+            proba = proba.ravel()
+            return np.vstack([1 - proba, proba]).T
+        return proba
+
+    def predict_proba(self, texts):
+        if self.kind == 'mlp':
+            return self._mlp_proba(list(texts))
+        return self._linear_proba(self.decision_function(list(texts)))
+
+    def predict(self, texts):
+        return self.predict_with_confidence(texts)[0]
+
+    def predict_with_confidence(self, texts):
+        """Return (labels, max class probabilities) for already-cleaned texts."""
+        texts = list(texts)
+        if self.kind == 'linear':
+            # Labels come from the decision function, exactly like LogisticRegression.predict
+            scores = self.decision_function(texts)
+            proba = self._linear_proba(scores)
+            idx = (scores > 0).astype(int) if scores.ndim == 1 else scores.argmax(axis=1)
+        else:
+            proba = self._mlp_proba(texts)
+            if self.weights[-1].shape[1] == 1:
+                # Binary MLP: LabelBinarizer thresholds the positive-class output at 0.5
+                idx = (proba[:, 1] > 0.5).astype(int)
+            else:
+                idx = proba.argmax(axis=1)
+        return self.classes_[idx], [float(c) for c in proba.max(axis=1)]
@@ -0,0 +1,122 @@
+import os
+
+# Tables handed between the root scripts (tweets_cleaned -> tweets_sentiment -> tweets_final)
+# are Parquet by default: typed, compressed and readable one column at a time.
+# INTERMEDIATE_FORMAT=csv keeps the text files; EXPORT_CSV=1 also writes a CSV copy of each Parquet table.
+INTERMEDIATE_FORMAT = os.environ.get('INTERMEDIATE_FORMAT', 'parquet')
+PARQUET_COMPRESSION = os.environ.get('PARQUET_COMPRESSION', 'zstd')
+EXPORT_CSV = os.environ.get('EXPORT_CSV', '0') == '1'
+FORMATS = {'parquet': '.parquet', 'csv': '.csv'}
+
+def is_parquet(path):
+    return path.lower().endswith('.parquet')
+
+def table_path(directory, name, fmt=None):
+    return os.path.join(directory, name + FORMATS[fmt or INTERMEDIATE_FORMAT])
+
+def find_table(directory, name):
+    """Path of the existing `name` table in `directory`, preferring Parquet over CSV; None if neither exists."""
+    for ext in ('.parquet', '.csv'):
+        path = os.path.join(directory, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+def table_columns(path):
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        return list(pq.ParquetFile(path).schema_arrow.names)
+    import pandas as pd
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def read_table(path, columns=None):
+    """Load a table; `columns` limits the read to those columns (missing ones are skipped)."""
+    import pandas as pd
+    if columns is not None:
+        available = set(table_columns(path))
+        columns = [c for c in columns if c in available]
+    if is_parquet(path):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+def iter_table(path, columns=None, chunksize=50000):
+    """Yield a table as DataFrames of at most `chunksize` rows."""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+        return
+    import pandas as pd
+    yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+class TableWriter:
+    """Writes a table chunk by chunk, as Parquet or CSV depending on the path's extension.
+
+    Parquet chunks become row groups of one file; the schema is fixed by the first chunk.
+    Columns with no values in that chunk are stored as strings, and a later chunk whose
+    values don't fit a string column is converted to text. If writing fails, the partial
+    output is deleted. With `export_csv` a CSV copy is written alongside.
+    """
+
+    def __init__(self, path, export_csv=EXPORT_CSV):
+        self.path = path
+        self.csv_path = os.path.splitext(path)[0] + '.csv' if export_csv or not is_parquet(path) else None
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        if is_parquet(self.path):
+            self._write_parquet(df)
+        if self.csv_path:
+            df.to_csv(self.csv_path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0,
+                      index=False, encoding='utf-8')
+        self.rows += len(df)
+
+    def _write_parquet(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if self._writer is None:
+            # pandas metadata would record the first chunk's dtypes, which later chunks may not share
+            schema = pa.Table.from_pandas(df, preserve_index=False).schema.remove_metadata()
+            for i, field in enumerate(schema):
+                # An all-NaN column (e.g. a mostly empty text column read as float64) may hold text later
+                if pa.types.is_null(field.type) or df[field.name].isna().all():
+                    schema = schema.set(i, field.with_type(pa.string()))
+            self._schema = schema
+            self._writer = pq.ParquetWriter(self.path, schema, compression=PARQUET_COMPRESSION)
+        self._writer.write_table(self._to_arrow(df))
+
+    def _to_arrow(self, df):
+        import pyarrow as pa
+        arrays = []
+        for field in self._schema:
+            column = df[field.name]
+            try:
+                arrays.append(pa.array(column, type=field.type, from_pandas=True))
+            except pa.ArrowException:
+                if not pa.types.is_string(field.type):
+                    raise
+                arrays.append(pa.array(column.astype(str).where(column.notna(), None), type=pa.string(),
+                                       from_pandas=True))
+        return pa.Table.from_arrays(arrays, schema=self._schema)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        if exc_type is not None:
+            # Never leave a truncated table behind for find_table to pick up
+            for path in (self.path, self.csv_path):
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+def write_table(df, path, export_csv=EXPORT_CSV):
+    with TableWriter(path, export_csv=export_csv) as writer:
+        writer.write(df)
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import pandas as pd
+from src.tables import write_table
+from trend_analysis import TrendStore, sentiment_trends
+
+def make_tweets(n):
+    return pd.DataFrame({
+        'tweet_created': pd.date_range('2015-02-17', periods=n, freq='min').astype(str),
+        'airline': [['United', 'Delta', 'Virgin America'][i % 3] for i in range(n)],
+        'final_sentiment': [['negative', 'positive', 'neutral', 'negative'][i % 4] for i in range(n)],
+    })
+
+def check_matches(store, path, df):
+    expected = sentiment_trends(df)[2]
+    actual = store.airline_sentiment(path)
+    assert actual.equals(expected.loc[actual.index, actual.columns]), f"{path}: store differs from a fresh groupby"
+
+def test_rewritten_file_is_reingested():
+    print("Testing trend store updates...")
+    df = make_tweets(30000)
+    for ext in ('.csv', '.parquet'):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tweets_final' + ext)
+            store = TrendStore(os.path.join(tmp, 'trends.sqlite'))
+            try:
+                write_table(df, path, export_csv=False)
+                assert store.update(path) == len(df)
+                assert store.update(path) == 0
+
+                # Same size and row count, different labels in the middle third
+                swapped = df.copy()
+                middle = slice(len(df) // 3, 2 * len(df) // 3)
+                swapped.loc[middle, 'final_sentiment'] = swapped.loc[middle, 'final_sentiment'].map(
+                    {'negative': 'positive', 'positive': 'negative', 'neutral': 'neutral'})
+                write_table(swapped, path, export_csv=False)
+                assert store.update(path) == len(df), f"{ext}: rewritten file was not re-ingested"
+                check_matches(store, path, swapped)
+
+                if ext == '.csv':
+                    # A pure append only folds in the new rows
+                    extra = make_tweets(100)
+                    extra.to_csv(path, mode='a', header=False, index=False)
+                    assert store.update(path) == len(extra)
+                    check_matches(store, path, pd.concat([swapped, extra], ignore_index=True))
+            finally:
+                store.close()
+        print(f"{ext}: ok")
+
+if __name__ == "__main__":
+    test_rewritten_file_is_reingested()
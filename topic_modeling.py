@@ -1,62 +1,155 @@
 import pandas as pd
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.decomposition import LatentDirichletAllocation as LDA
 import os
+from src.tables import read_table, write_table, iter_table, TableWriter, find_table, table_path
 
-def extract_topics(file_path, output_path, n_topics=5):
-    print(f"Loading {file_path}...")
-    df = pd.read_csv(file_path)
-    
+# 'batch' fits LDA on the whole column in memory; 'online' streams mini-batches from disk
+TOPIC_MODE = os.environ.get('TOPIC_MODE', 'batch')
+TOPIC_CHUNKSIZE = int(os.environ.get('TOPIC_CHUNKSIZE', 50000))
+# Rows used to fit the TF-IDF vocabulary (and the LDA itself with TOPIC_FIT_ON_SAMPLE=1) in online mode
+TOPIC_SAMPLE_SIZE = int(os.environ.get('TOPIC_SAMPLE_SIZE', 200000))
+TOPIC_FIT_ON_SAMPLE = os.environ.get('TOPIC_FIT_ON_SAMPLE', '0') == '1'
+
+def top_keywords(lda, feature_names, n=10):
+    return {i: [feature_names[index] for index in topic.argsort()[-n:]] for i, topic in enumerate(lda.components_)}
+
+def topic_labels(topic_keywords):
+    # One label per topic; rows get theirs by indexing with topic_id
+    return np.array([f"Topic {i}: " + ", ".join(topic_keywords[i][:3]) for i in range(len(topic_keywords))],
+                    dtype=object)
+
+def impact_levels(negative_counts, sentiment_counts):
+    # Impact = share of negative sentiment in the topic (rows without a sentiment are not counted)
+    neg_ratio = np.divide(negative_counts, sentiment_counts, out=np.zeros(len(negative_counts)),
+                          where=sentiment_counts > 0)
+    return np.select([neg_ratio > 0.7, neg_ratio > 0.4], ["High", "Medium"], default="Low").astype(object)
+
+def sentiment_counts_by_topic(topic_ids, sentiments, n_topics):
+    """Per-topic (negative count, non-null sentiment count) for one chunk of rows."""
+    negative = np.bincount(topic_ids, weights=(sentiments == 'negative').to_numpy(dtype=float), minlength=n_topics)
+    total = np.bincount(topic_ids, weights=sentiments.notna().to_numpy(dtype=float), minlength=n_topics)
+    return negative, total
+
+def print_keywords(topic_keywords):
+    print("Topic Keywords identified:")
+    for i, keywords in topic_keywords.items():
+        print(f"Topic {i}: {', '.join(keywords)}")
+
+def assign_topics(df, n_topics=5):
+    """Fit LDA on the whole cleaned_text column and add the topic columns (in place); returns it."""
     # Fill NaN just in case
     texts = df['cleaned_text'].fillna("")
-    
+
     print("Vectorizing text...")
     vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
     tfidf_matrix = vectorizer.fit_transform(texts)
-    
+
     print(f"Fitting LDA with {n_topics} topics...")
-    from sklearn.decomposition import LatentDirichletAllocation
-    lda = LatentDirichletAllocation(n_components=n_topics, random_state=42)
+    lda = LDA(n_components=n_topics, random_state=42)
     lda.fit(tfidf_matrix)
-    
+
     # Assign topics to records
     topic_results = lda.transform(tfidf_matrix)
-    df['topic_id'] = topic_results.argmax(axis=1)
-    
+    topic_ids = topic_results.argmax(axis=1)
+    df['topic_id'] = topic_ids
+
     # Get top words for each topic
-    feature_names = vectorizer.get_feature_names_out()
-    topic_keywords = {}
-    for i, topic in enumerate(lda.components_):
-        topic_keywords[i] = [feature_names[index] for index in topic.argsort()[-10:]]
-    
-    print("Topic Keywords identified:")
-    for i, keywords in topic_keywords.items():
-        print(f"Topic {i}: {', '.join(keywords)}")
+    topic_keywords = top_keywords(lda, vectorizer.get_feature_names_out())
+    print_keywords(topic_keywords)
 
     # Map topic IDs to descriptive labels based on keywords (Manual/Heuristic)
     # For now, we'll keep it as "Topic X" or try to name the top keyword.
-    df['topic_label'] = df['topic_id'].apply(lambda x: f"Topic {x}: " + ", ".join(topic_keywords[x][:3]))
-    
+    df['topic_label'] = topic_labels(topic_keywords)[topic_ids]
+
     # Calculate Reputation Impact
     # Impact = Volume of Negative sentiment in that topic
-    topic_sentiment = df.groupby('topic_id')['final_sentiment'].value_counts(normalize=True).unstack().fillna(0)
-    
-    def get_impact_level(topic_id):
-        neg_ratio = topic_sentiment.loc[topic_id].get('negative', 0)
-        if neg_ratio > 0.7: return "High"
-        if neg_ratio > 0.4: return "Medium"
-        return "Low"
-    
-    df['reputation_impact'] = df['topic_id'].apply(get_impact_level)
-    
+    levels = impact_levels(*sentiment_counts_by_topic(topic_ids, df['final_sentiment'], n_topics))
+    df['reputation_impact'] = levels[topic_ids]
+    return df
+
+def extract_topics(file_path, output_path, n_topics=5):
+    print(f"Loading {file_path}...")
+    df = read_table(file_path)
+    assign_topics(df, n_topics=n_topics)
+
     print(f"Saving results to {output_path}...")
-    df.to_csv(output_path, index=False)
+    write_table(df, output_path)
+    print("Done.")
+
+def _sample_texts(file_path, chunksize, sample_size, random_state=42):
+    # One pass: total row count plus a uniform random sample (smallest random keys win)
+    rng = np.random.RandomState(random_state)
+    sample, n_rows = None, 0
+    for chunk in iter_table(file_path, columns=['cleaned_text'], chunksize=chunksize):
+        n_rows += len(chunk)
+        part = pd.DataFrame({'key': rng.rand(len(chunk)), 'text': chunk['cleaned_text'].fillna("").to_numpy()})
+        sample = part if sample is None else pd.concat([sample, part], ignore_index=True)
+        sample = sample.nsmallest(sample_size, 'key')
+    return sample['text'], n_rows
+
+def extract_topics_online(file_path, output_path, n_topics=5, chunksize=TOPIC_CHUNKSIZE,
+                          sample_size=TOPIC_SAMPLE_SIZE, fit_on_sample=TOPIC_FIT_ON_SAMPLE,
+                          batch_size=4096, n_jobs=-1, random_state=42):
+    """Topic extraction in bounded memory: online LDA over mini-batches read from disk.
+
+    The TF-IDF vocabulary is fitted on a random sample of `sample_size` rows. LDA is then
+    either updated with `partial_fit` over every chunk (one pass), or, with
+    `fit_on_sample=True`, fitted on the sample only. Every row is assigned with a full
+    streaming `transform` and the output is written chunk by chunk.
+    """
+    print(f"Sampling {file_path}...")
+    sample, n_rows = _sample_texts(file_path, chunksize, sample_size, random_state)
+
+    print(f"Vectorizing text (vocabulary from {len(sample)} of {n_rows} rows)...")
+    vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+    sample_matrix = vectorizer.fit_transform(sample)
+
+    lda = LDA(n_components=n_topics, learning_method='online', batch_size=batch_size,
+              total_samples=len(sample) if fit_on_sample else n_rows, n_jobs=n_jobs, random_state=random_state)
+    if fit_on_sample:
+        print(f"Fitting online LDA with {n_topics} topics on the sample...")
+        lda.fit(sample_matrix)
+    else:
+        print(f"Fitting online LDA with {n_topics} topics over {n_rows} rows...")
+        for chunk in iter_table(file_path, columns=['cleaned_text'], chunksize=chunksize):
+            lda.partial_fit(vectorizer.transform(chunk['cleaned_text'].fillna("")))
+
+    topic_keywords = top_keywords(lda, vectorizer.get_feature_names_out())
+    print_keywords(topic_keywords)
+
+    # Assign topics; labels and impact are only known once every row has a topic
+    print("Assigning topics...")
+    topic_ids = []
+    negative, total = np.zeros(n_topics), np.zeros(n_topics)
+    for chunk in iter_table(file_path, columns=['cleaned_text', 'final_sentiment'], chunksize=chunksize):
+        ids = lda.transform(vectorizer.transform(chunk['cleaned_text'].fillna(""))).argmax(axis=1)
+        chunk_negative, chunk_total = sentiment_counts_by_topic(ids, chunk['final_sentiment'], n_topics)
+        negative += chunk_negative
+        total += chunk_total
+        topic_ids.append(ids.astype(np.int32))
+    topic_ids = np.concatenate(topic_ids) if topic_ids else np.zeros(0, dtype=np.int32)
+    labels = topic_labels(topic_keywords)
+    levels = impact_levels(negative, total)
+
+    print(f"Saving results to {output_path}...")
+    offset = 0
+    with TableWriter(output_path) as writer:
+        for chunk in iter_table(file_path, chunksize=chunksize):
+            ids = topic_ids[offset:offset + len(chunk)]
+            chunk['topic_id'] = ids
+            chunk['topic_label'] = labels[ids]
+            chunk['reputation_impact'] = levels[ids]
+            writer.write(chunk)
+            offset += len(chunk)
     print("Done.")
 
 if __name__ == "__main__":
     base_path = r"d:\Desktop\Rivoo\Sentiment Analysis\data"
-    
+
     # Process Tweets
-    tweets_sentiment = os.path.join(base_path, "tweets_sentiment.csv")
-    if os.path.exists(tweets_sentiment):
-        extract_topics(tweets_sentiment, os.path.join(base_path, "tweets_final.csv"))
+    tweets_sentiment = find_table(base_path, "tweets_sentiment")
+    if tweets_sentiment:
+        extract = extract_topics_online if TOPIC_MODE == 'online' else extract_topics
+        extract(tweets_sentiment, table_path(base_path, "tweets_final"))
@@ -1,34 +1,247 @@
 import pandas as pd
+import hashlib
 import os
+import sqlite3
+from src.tables import is_parquet, find_table
 
-def analyze_trends(file_path):
-    print(f"Loading {file_path}...")
-    df = pd.read_csv(file_path)
-    
-    # Convert 'tweet_created' to datetime
+# Appended rows are folded into the store in chunks of this many records
+TREND_CHUNKSIZE = int(os.environ.get('TREND_CHUNKSIZE', 100000))
+HASH_BLOCK = 1 << 20
+# The only columns the aggregates need; the rest of each record is never parsed
+TREND_COLUMNS = ['tweet_created', 'airline', 'final_sentiment']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_sentiment (
+    source TEXT, date TEXT, sentiment TEXT, n INTEGER,
+    PRIMARY KEY (source, date, sentiment));
+CREATE TABLE IF NOT EXISTS airline_sentiment (
+    source TEXT, airline TEXT, sentiment TEXT, n INTEGER,
+    PRIMARY KEY (source, airline, sentiment));
+-- byte_offset is the bytes folded in for a CSV source and the rows folded in for Parquet;
+-- head_digest is a sha256 of everything folded in (the CSV prefix, the Parquet row group data)
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY, columns TEXT, byte_offset INTEGER, head_digest TEXT, rows INTEGER);
+"""
+
+def _hash_bytes(f, sha, length):
+    # Feeds the next `length` bytes of `f` into `sha` without holding them in memory
+    while length > 0:
+        block = f.read(min(length, HASH_BLOCK))
+        if not block:
+            break
+        sha.update(block)
+        length -= len(block)
+
+def _row_groups_digest(parquet, path, n_groups):
+    """Digest of the column chunk bytes of the first `n_groups` row groups of a Parquet file."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for i in range(n_groups):
+            group = parquet.metadata.row_group(i)
+            for j in range(group.num_columns):
+                column = group.column(j)
+                f.seek(column.dictionary_page_offset if column.has_dictionary_page else column.data_page_offset)
+                _hash_bytes(f, sha, column.total_compressed_size)
+    return sha.hexdigest()
+
+def _ends_row(path, offset):
+    """True if `offset` is the start of `path` or directly follows a newline."""
+    if offset == 0:
+        return True
+    with open(path, 'rb') as f:
+        f.seek(offset - 1)
+        return f.read(1) == b'\n'
+
+class TrendStore:
+    """SQLite store of per-day x sentiment and per-airline x sentiment tweet counts.
+
+    The store remembers how many bytes of each source CSV it has folded in, with a digest
+    of those bytes, and only parses what was appended since. Any other change (a file
+    that shrank, was rewritten, or no longer has a row boundary at that point) re-ingests
+    it from scratch, so a rewritten tweets_final is always counted afresh; the unchanged
+    prefix is re-hashed on every update, which is much cheaper than parsing it. Run
+    updates between appends, not while a writer is mid-row. Parquet sources are tracked
+    by the row groups folded in, compared by their bytes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _reset_source(self, source):
+        for table in ('daily_sentiment', 'airline_sentiment', 'sources'):
+            self.conn.execute(f"DELETE FROM {table} WHERE source = ?", (source,))
+        self.conn.commit()
+
+    def update(self, file_path):
+        """Fold records appended to `file_path` since the last update into the aggregates; returns the row count."""
+        source = os.path.abspath(file_path)
+        if is_parquet(file_path):
+            return self._update_parquet(source, file_path)
+        size = os.path.getsize(file_path)
+        state = self.conn.execute("SELECT columns, byte_offset, head_digest FROM sources WHERE source = ?",
+                                  (source,)).fetchone()
+        with open(file_path, 'rb') as f:
+            sha, resumed = hashlib.sha256(), False
+            if state and size >= state[1] and _ends_row(file_path, state[1]):
+                _hash_bytes(f, sha, state[1])
+                resumed = sha.hexdigest() == state[2]
+            if resumed:
+                columns, offset = state[0].split('\x1f'), state[1]
+            else:
+                self._reset_source(source)
+                sha = hashlib.sha256()
+                columns, offset = None, 0
+            if size == offset:
+                return 0
+
+            if columns is None:
+                columns = list(pd.read_csv(file_path, nrows=0).columns)
+            rows = 0
+            f.seek(offset)
+            # From the top the header row is skipped; appended bytes have none
+            reader = pd.read_csv(f, header=0 if offset == 0 else None, names=columns,
+                                 usecols=[c for c in columns if c in TREND_COLUMNS], chunksize=TREND_CHUNKSIZE)
+            with self.conn:
+                for chunk in reader:
+                    rows += len(chunk)
+                    self._fold(source, chunk)
+                f.seek(offset)
+                _hash_bytes(f, sha, size - offset)
+                self._save_state(source, columns, size, sha.hexdigest(), rows)
+        return rows
+
+    def _update_parquet(self, source, file_path):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(file_path)
+        metadata = parquet.metadata
+        state = self.conn.execute("SELECT byte_offset, head_digest FROM sources WHERE source = ?",
+                                  (source,)).fetchone()
+        # The leading row groups that hold exactly the rows folded in last time
+        done, offset = 0, 0
+        while state and done < metadata.num_row_groups and offset < state[0]:
+            offset += metadata.row_group(done).num_rows
+            done += 1
+        if not (state and offset == state[0] and _row_groups_digest(parquet, file_path, done) == state[1]):
+            self._reset_source(source)
+            done, offset = 0, 0
+        if done == metadata.num_row_groups:
+            return 0
+
+        columns = parquet.schema_arrow.names
+        with self.conn:
+            for batch in parquet.iter_batches(batch_size=TREND_CHUNKSIZE,
+                                              row_groups=list(range(done, metadata.num_row_groups)),
+                                              columns=[c for c in columns if c in TREND_COLUMNS]):
+                self._fold(source, batch.to_pandas())
+            self._save_state(source, columns, metadata.num_rows,
+                             _row_groups_digest(parquet, file_path, metadata.num_row_groups),
+                             metadata.num_rows - offset)
+        return metadata.num_rows - offset
+
+    def _save_state(self, source, columns, offset, head_digest, rows):
+        self.conn.execute(
+            "INSERT INTO sources VALUES (?, ?, ?, ?, ?) ON CONFLICT(source) DO UPDATE SET "
+            "columns = excluded.columns, byte_offset = excluded.byte_offset, "
+            "head_digest = excluded.head_digest, rows = sources.rows + excluded.rows",
+            (source, '\x1f'.join(columns), offset, head_digest, rows))
+
+    def _fold(self, source, df):
+        df = df.dropna(subset=['final_sentiment'])
+        if 'tweet_created' in df.columns:
+            # Rows with unparseable timestamps are left out of both tables, as before
+            created = pd.to_datetime(df['tweet_created'], errors='coerce')
+            valid = created.notna()
+            df = df[valid]
+            daily = df.groupby([created[valid].dt.strftime('%Y-%m-%d'), 'final_sentiment']).size()
+            self._add('daily_sentiment', 'date', source, daily)
+        if 'airline' in df.columns:
+            airline = df.dropna(subset=['airline']).groupby(['airline', 'final_sentiment']).size()
+            self._add('airline_sentiment', 'airline', source, airline)
+
+    def _add(self, table, key, source, counts):
+        self.conn.executemany(
+            f"INSERT INTO {table} (source, {key}, sentiment, n) VALUES (?, ?, ?, ?) "
+            f"ON CONFLICT(source, {key}, sentiment) DO UPDATE SET n = n + excluded.n",
+            [(source, str(k), str(s), int(n)) for (k, s), n in counts.items()])
+
+    def _table(self, table, key, file_path):
+        # Counts of one source only; a store may also hold other files from the same directory
+        rows = self.conn.execute(
+            f"SELECT {key}, sentiment, SUM(n) FROM {table} WHERE source = ? "
+            f"GROUP BY {key}, sentiment ORDER BY {key}", (os.path.abspath(file_path),)).fetchall()
+        if not rows:
+            return pd.DataFrame()
+        counts = pd.DataFrame(rows, columns=[key, 'final_sentiment', 'n'])
+        return counts.pivot(index=key, columns='final_sentiment', values='n').fillna(0).astype(int)
+
+    def daily_sentiment(self, file_path):
+        return self._table('daily_sentiment', 'date', file_path)
+
+    def airline_sentiment(self, file_path):
+        return self._table('airline_sentiment', 'airline', file_path)
+
+    def peak(self, file_path, sentiment='negative'):
+        """(date, count) of the day with the most `sentiment` tweets in `file_path` (earliest on ties), or None."""
+        return self.conn.execute(
+            "SELECT date, SUM(n) AS total FROM daily_sentiment WHERE source = ? AND sentiment = ? "
+            "GROUP BY date ORDER BY total DESC, date LIMIT 1", (os.path.abspath(file_path), sentiment)).fetchone()
+
+def sentiment_trends(df):
+    """In-memory equivalent of the store queries: (daily table, (peak date, count) or None, airline table)."""
+    df = df.dropna(subset=['final_sentiment'])
+    daily, peak, airline = pd.DataFrame(), None, pd.DataFrame()
     if 'tweet_created' in df.columns:
-        df['tweet_created'] = pd.to_datetime(df['tweet_created'], errors='coerce')
-        df = df.dropna(subset=['tweet_created'])
-        
-        # Trend by Day
-        df['date'] = df['tweet_created'].dt.date
-        daily_sentiment = df.groupby(['date', 'final_sentiment']).size().unstack(fill_value=0)
-        
+        created = pd.to_datetime(df['tweet_created'], errors='coerce')
+        valid = created.notna()
+        df = df[valid]
+        daily = df.groupby([created[valid].dt.strftime('%Y-%m-%d').rename('date'), 'final_sentiment']).size()
+        daily = daily.unstack(fill_value=0)
+        if 'negative' in daily.columns and len(daily):
+            peak = (daily['negative'].idxmax(), int(daily['negative'].max()))
+    if 'airline' in df.columns:
+        airline = df.groupby(['airline', 'final_sentiment']).size().unstack(fill_value=0)
+    return daily, peak, airline
+
+def print_trends(daily_sentiment, peak, airline_sentiment):
+    if not daily_sentiment.empty:
         print("\n[Sentiment Trends over Time (Daily)]")
         print(daily_sentiment.head(10))
-        
+
         # Peak Negativity Detection
-        if 'negative' in daily_sentiment.columns:
-            peak_neg_day = daily_sentiment['negative'].idxmax()
-            print(f"\nPeak negativity detected on: {peak_neg_day} with {daily_sentiment.loc[peak_neg_day, 'negative']} negative tweets.")
+        if peak:
+            print(f"\nPeak negativity detected on: {peak[0]} with {peak[1]} negative tweets.")
 
     # Source Analysis (by Airline in this dataset)
-    if 'airline' in df.columns:
-        airline_sentiment = df.groupby(['airline', 'final_sentiment']).size().unstack(fill_value=0)
+    if not airline_sentiment.empty:
         print("\n[Sentiment by airline (Source Analysis)]")
         print(airline_sentiment)
 
+def report_trends(df, output_dir):
+    """Print the trend tables for an in-memory DataFrame and save them as CSVs in `output_dir`."""
+    os.makedirs(output_dir, exist_ok=True)
+    daily_sentiment, peak, airline_sentiment = sentiment_trends(df)
+    print_trends(daily_sentiment, peak, airline_sentiment)
+    daily_sentiment.to_csv(os.path.join(output_dir, 'daily_sentiment.csv'))
+    airline_sentiment.to_csv(os.path.join(output_dir, 'airline_sentiment.csv'))
+
+def analyze_trends(file_path, store_path=None):
+    store_path = store_path or os.environ.get('TREND_STORE') or os.path.join(
+        os.path.dirname(os.path.abspath(file_path)), 'trend_aggregates.sqlite')
+    print(f"Updating {store_path} from {file_path}...")
+    store = TrendStore(store_path)
+    try:
+        print(f"{store.update(file_path)} new records folded in.")
+        print_trends(store.daily_sentiment(file_path), store.peak(file_path, 'negative'),
+                     store.airline_sentiment(file_path))
+    finally:
+        store.close()
+
 if __name__ == "__main__":
-    final_data = r"d:\Desktop\Rivoo\Sentiment Analysis\data\tweets_final.csv"
-    if os.path.exists(final_data):
+    final_data = find_table(r"d:\Desktop\Rivoo\Sentiment Analysis\data", "tweets_final")
+    if final_data:
         analyze_trends(final_data)
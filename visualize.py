@@ -1,11 +1,16 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+from src.tables import read_table, find_table
+
+VISUAL_COLUMNS = ['final_sentiment', 'airline', 'topic_id', 'topic_label']
 
 def generate_visuals(file_path, output_dir):
+    # Only the columns plotted below are read
+    plot_visuals(read_table(file_path, columns=VISUAL_COLUMNS), output_dir)
+
+def plot_visuals(df, output_dir):
     os.makedirs(output_dir, exist_ok=True)
-    df = pd.read_csv(file_path)
     
     # 1. Sentiment Distribution
     plt.figure(figsize=(8, 6))
@@ -34,8 +39,8 @@ def generate_visuals(file_path, output_dir):
         plt.close()
 
 if __name__ == "__main__":
-    final_data = r"d:\Desktop\Rivoo\Sentiment Analysis\data\tweets_final.csv"
+    final_data = find_table(r"d:\Desktop\Rivoo\Sentiment Analysis\data", "tweets_final")
     output_visuals = r"d:\Desktop\Rivoo\Sentiment Analysis\reports\visuals"
-    if os.path.exists(final_data):
+    if final_data:
         generate_visuals(final_data, output_visuals)
         print(f"Visuals saved to {output_visuals}")